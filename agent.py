@@ -1,4 +1,5 @@
 # agent.py
+import tracing
 from paper_fetcher import fetch_papers
 from summarizer import summarize_papers
 from timeline_builder import build_timeline
@@ -11,20 +12,25 @@ class AURALitAgent:
         self.thoughts.append(message)
 
     def run(self, query):
-        self.log("Understanding research intent")
-        
-        self.log("Fetching relevant academic papers")
-        papers = fetch_papers(query)
+        with tracing.start_trace("AURALitAgent.run", query=query) as trace:
+            self.log("Understanding research intent")
 
-        self.log("Summarizing existing systems from abstracts")
-        summaries = summarize_papers(papers)
+            self.log("Fetching relevant academic papers")
+            with tracing.span("fetch_papers"):
+                papers = fetch_papers(query)
 
-        self.log("Building year-wise evolution timeline")
-        timeline = build_timeline(papers)
+            self.log("Summarizing existing systems from abstracts")
+            with tracing.span("summarize_papers"):
+                summaries = summarize_papers(papers)
+
+            self.log("Building year-wise evolution timeline")
+            with tracing.span("build_timeline"):
+                timeline = build_timeline(papers)
 
         return {
             "papers": papers,
             "summaries": summaries,
             "timeline": timeline,
-            "agent_thoughts": self.thoughts
-        }
+            "agent_thoughts": self.thoughts,
+            "trace": trace.to_dict()
+        }
\ No newline at end of file
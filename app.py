@@ -1,7 +1,26 @@
+import os
 import streamlit as st
-from paper_fetcher import fetch_papers
-from timeline_builder import build_timeline
-from summarizer import predict_contribution
+from paper_fetcher import iter_papers, iter_large_corpus, query_cache_stats
+from timeline_builder import TimelineBuilder, RESOLUTIONS
+from summarizer import predict_contribution, iter_predict_contributions, classify_domains, llm_call_stats, llm_cache_stats
+from result_cache import SharedResultCache
+from paper_store import PaperTable, PaperStoreWriter, corpus_path, read_page
+from trends import TrendAnalyzer
+from cache import normalize_query
+import json
+import llm_client
+import rate_limit
+import tracing
+
+# Off by default: embedding needs the sentence-transformers stack, which
+# is only imported once this is enabled and a search runs
+SEMANTIC_SEARCH = os.getenv("AURA_SEMANTIC_SEARCH", "0") == "1"
+
+# Paper cards rendered per year before paginating
+PAGE_SIZE = 20
+
+# Titles listed per year in the live preview while papers stream in
+PREVIEW_TITLES = 10
 
 # -------------------- PAGE CONFIG -------------------- #
 st.set_page_config(
@@ -278,6 +297,73 @@ if "summaries" not in st.session_state:
 if "result" not in st.session_state:
     st.session_state.result = None
 
+if "llm_traces" not in st.session_state:
+    st.session_state.llm_traces = []
+
+if "prefetch" not in st.session_state:
+    st.session_state.prefetch = None
+
+# -------------------- SHARED RESOURCES -------------------- #
+@st.cache_resource
+def load_vector_index():
+    from vector_index import get_index
+    return get_index()
+
+
+@st.cache_resource
+def shared_results():
+    # One result per normalized query, shared by every session; concurrent
+    # submissions of the same topic trigger a single upstream fetch
+    return SharedResultCache(
+        max_entries=int(os.getenv("AURA_RESULT_CACHE_MAX_ENTRIES", 64)),
+        ttl=int(os.getenv("AURA_RESULT_CACHE_TTL", 1800))
+    )
+
+
+@st.cache_resource
+def prefetcher():
+    # One speculative worker pool for all sessions; it runs in the
+    # lowest rate-limit lane so clicks always go first
+    from prefetch import Prefetcher
+    return Prefetcher()
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def store_page(store, year, offset, size, version):
+    # Shared by every rerun and session; version (the store's mtime)
+    # retires pages of a corpus that has since been re-fetched
+    return read_page(store, year, offset, size).to_pylist()
+
+
+def load_store_page(store, year, offset, size):
+    return store_page(store, year, offset, size, os.path.getmtime(store))
+
+
+# -------------------- TRACE VIEW -------------------- #
+def render_trace(trace):
+    """Flame-style breakdown: one bar per span, offset and sized by time."""
+    rows = tracing.flame_rows(trace)
+    if not rows:
+        return
+
+    total = max(s["start_ms"] + s["duration_ms"] for _, s in rows) or 1.0
+
+    for depth, s in rows:
+        left = 100 * s["start_ms"] / total
+        width = max(0.5, 100 * s["duration_ms"] / total)
+        counters = " · ".join(f"{k} {v:,}" for k, v in s["counters"].items())
+
+        st.markdown(f"""
+        <div style="margin-left:{left:.2f}%; width:{width:.2f}%; min-width:fit-content;
+                    background:rgba(79,209,197,{0.35 - min(depth, 4) * 0.05:.2f});
+                    border-left:3px solid #4fd1c5; border-radius:4px;
+                    padding:2px 8px; margin-top:2px; font-size:12px; white-space:nowrap;">
+            <b>{s['name']}</b> {s['duration_ms']:.1f} ms
+            <span style="opacity:0.7;">{counters}</span>
+        </div>
+        """, unsafe_allow_html=True)
+
+
 # -------------------- AGENT -------------------- #
 class AURALitAgent:
 
@@ -288,39 +374,294 @@ class AURALitAgent:
     def think(self, message):
         self.thoughts.append(message)
 
-    def run(self, query):
+    def run(self, query, on_progress=None, expand_citations=False, refresh=False):
 
         self.thoughts = []
         cleaned_query = query.strip()
 
-        self.think("Analyzing research query intent")
-        self.think("Retrieving academic publications (2000 → Present)")
+        with tracing.start_trace("AURALitAgent.run", query=cleaned_query, expand_citations=expand_citations) as trace:
 
-        papers = fetch_papers(
-            query=cleaned_query,
-            limit=100,
-            start_year=2000
-        )
+            self.think("Analyzing research query intent")
+            self.think("Retrieving academic publications (2000 → Present)")
+
+            papers = []
+            preview = TimelineBuilder()
+
+            with tracing.span("fetch_papers") as fetch_span:
+                for batch in iter_papers(
+                    query=cleaned_query,
+                    limit=100,
+                    start_year=2000,
+                    refresh=refresh
+                ):
+                    papers.extend(batch)
+                    preview.add(batch)
+
+                    if on_progress:
+                        on_progress(preview.counts(), len(papers), batch)
+
+                fetch_span.set("papers", len(papers))
+
+            self.think(f"Retrieved {len(papers)} papers")
+
+            if expand_citations and papers:
+                self.think("Expanding leading papers through their references and citations")
+                from citation_graph import expand_citations as expand
+                from dedup import dedupe
+
+                with tracing.span("citation_expansion") as expand_span:
+                    found = len(papers)
+                    papers = dedupe(papers + expand(papers, start_year=2000))
+                    expand_span.set("papers", len(papers) - found)
 
-        self.think(f"Retrieved {len(papers)} papers")
+                self.think(f"Added {len(papers) - found} influential papers from the citation graph")
 
-        self.think("Constructing chronological research timeline")
-        timeline = build_timeline(papers)
+            papers = sorted(papers, key=lambda x: x["year"])
 
-        self.think("Timeline construction completed")
+            if SEMANTIC_SEARCH and papers:
+                self.think("Indexing papers and ranking by semantic relevance")
+                from semantic_classifier import embed_papers
+                from vector_index import rerank
+
+                with tracing.span("semantic_rank"):
+                    vectors = embed_papers(papers)
+                    load_vector_index().add(papers, vectors)
+                    papers = rerank(cleaned_query, papers, vectors=vectors)
+
+            # Columnar from here on; callers still iterate paper dicts
+            papers = PaperTable.from_papers(papers)
+
+            self.think("Classifying research domains")
+            with tracing.span("classify_domains"):
+                papers = papers.with_domains(classify_domains(papers))
+
+            self.think("Constructing chronological research timeline")
+            with tracing.span("build_timeline"):
+                builder = TimelineBuilder()
+                builder.add(papers)
+                timeline = builder.timeline()
+
+            self.think("Clustering sub-topics and detecting emerging trends")
+            with tracing.span("topic_trends"):
+                analyzer = TrendAnalyzer(cleaned_query)
+                analyzer.add(papers)
+                trends = analyzer.trends()
+
+            self.think("Timeline construction completed")
 
         return {
             "papers": papers,
             "timeline": timeline,
-            "thoughts": self.thoughts
+            "summary": {r: builder.summary(r) for r in RESOLUTIONS},
+            "trends": trends,
+            "thoughts": self.thoughts,
+            "trace": trace.to_dict()
+        }
+
+    def run_large(self, query, max_papers, on_progress=None):
+        """
+        Streams a whole-field corpus into an on-disk Parquet store; only
+        the timeline aggregates stay in memory and pages are read back on demand.
+        """
+        self.thoughts = []
+        cleaned_query = query.strip()
+        path = corpus_path(cleaned_query, max_papers, 2000)
+
+        with tracing.start_trace("AURALitAgent.run_large", query=cleaned_query, max_papers=max_papers) as trace:
+
+            self.think("Analyzing research query intent")
+            self.think(f"Paging through up to {max_papers:,} publications (2000 → Present)")
+
+            builder = TimelineBuilder(keep_papers=False)
+            analyzer = TrendAnalyzer(cleaned_query)
+
+            with tracing.span("fetch_papers") as fetch_span:
+                with PaperStoreWriter(path) as writer:
+                    for batch in iter_large_corpus(cleaned_query, max_papers, start_year=2000):
+
+                        with tracing.span("classify_domains", papers=len(batch)):
+                            for paper, domains in zip(batch, classify_domains(batch)):
+                                paper["domains"] = domains
+
+                        writer.write(batch)
+                        builder.add(batch)
+
+                        with tracing.span("topic_trends", papers=len(batch)):
+                            analyzer.add(batch)
+
+                        if on_progress:
+                            on_progress(builder.counts(), writer.count, batch)
+
+                fetch_span.set("papers", writer.count)
+
+            self.think(f"Stored {writer.count:,} papers in a columnar corpus")
+            self.think("Timeline and topic clusters updated incrementally while paging")
+
+            with tracing.span("topic_trends"):
+                trends = analyzer.trends()
+
+        return {
+            "store": path,
+            "papers_count": writer.count,
+            "summary": {r: builder.summary(r) for r in RESOLUTIONS},
+            "trends": trends,
+            "thoughts": self.thoughts,
+            "trace": trace.to_dict()
         }
 
+# -------------------- PAPER VIEW -------------------- #
+def render_paper(p, paper_id):
+
+    # Summaries are keyed by title so a new query never
+    # shows a stale summary under a reused position
+    summary_key = p["title"]
+
+    # Paper Card
+    st.markdown(f"""
+    <div class="paper-card">
+        <h4>{p['title']}</h4>
+        <p style="color:#9ca3af; font-size:14px;">
+            {p['authors']} | {p['source']}
+        </p>
+        <a href="{p['link']}" target="_blank" style="color:#4fd1c5;">
+            📄 View Publication
+        </a>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Predict Button
+    if st.button("Predict Contribution", key=f"btn_{paper_id}"):
+
+        if summary_key not in st.session_state.summaries:
+            with st.spinner("Analyzing Research Contribution..."):
+                with tracing.start_trace("predict_contribution", title=p["title"]) as trace:
+                    job = st.session_state.prefetch
+                    insight = job.result(p["title"]) if job else None
+
+                    if insight is None:
+                        # Tokens show up here as they stream; the card below
+                        # replaces them once the paragraph is complete
+                        stream_box = st.empty()
+                        insight = predict_contribution(
+                            p["title"],
+                            p.get("domains"),
+                            on_token=lambda text: stream_box.markdown(text + " ▌")
+                        )
+                        stream_box.empty()
+                st.session_state.summaries[summary_key] = insight
+                st.session_state.llm_traces.append(trace.to_dict())
+
+    # Related Work
+    if SEMANTIC_SEARCH and st.button("Similar Papers", key=f"sim_{paper_id}"):
+        for similar, score in load_vector_index().similar_to(p, k=5):
+            st.markdown(
+                f"- [{similar['title']}]({similar['link']}) "
+                f"({similar['year']}) · similarity {score:.2f}"
+            )
+
+    # Summary Display
+    if summary_key in st.session_state.summaries:
+
+        data = st.session_state.summaries[summary_key]
+
+        st.markdown('<div class="summary-card">', unsafe_allow_html=True)
+        st.markdown("### Research Summary")
+        st.write(data["paragraph"])
+
+        col1, col2 = st.columns(2)
+        col1.metric("Confidence Score", f"{data['confidence']}%")
+        col2.metric("Innovation Level", data["novelty"])
+
+        st.markdown("**Potential Impact**")
+        st.write(data["impact"])
+
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+def render_year(year, count, load_page, stats=None):
+    """
+    One timeline entry; load_page(offset, size) returns the papers shown.
+    """
+    with st.expander(f"📆 {year} — {count:,} papers"):
+
+        if stats:
+            domains = ", ".join(f"{d} ({n})" for d, n in stats["top_domains"])
+            sources = ", ".join(f"{s} {share:.0%}" for s, share in stats["sources"].items())
+            st.caption(f"Top domains: {domains or '—'} · Sources: {sources}")
+
+        pages = max(1, -(-count // PAGE_SIZE))
+        page = 1
+
+        if pages > 1:
+            page = st.number_input(
+                f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"page_{year}"
+            )
+
+        offset = (page - 1) * PAGE_SIZE
+        items = load_page(offset, PAGE_SIZE)
+
+        # Paging further into a year shows interest; warm that page too
+        if page > 1 and st.session_state.prefetch:
+            st.session_state.prefetch.queue(items)
+
+        # Bulk Predict Button (current page)
+        pending = [
+            p for p in items
+            if p["title"] not in st.session_state.summaries
+        ]
+
+        if pending and st.button(
+            f"Predict All Contributions ({len(pending)})",
+            key=f"btn_all_{year}_{page}"
+        ):
+            progress = st.progress(0.0, text="Analyzing Research Contributions...")
+
+            titles = [p["title"] for p in pending]
+            domains = [p.get("domains") for p in pending]
+
+            # Queued behind individual clicks at the Groq rate limiter,
+            # so each paper may wait longer than a click's deadline
+            with rate_limit.priority(rate_limit.BULK), \
+                    llm_client.budget(queue_timeout=llm_client.BULK_QUEUE_TIMEOUT), \
+                    tracing.start_trace("predict_contributions", year=year, papers=len(pending)) as trace:
+                for done, (i, insight) in enumerate(
+                    iter_predict_contributions(titles, domains=domains), start=1
+                ):
+                    st.session_state.summaries[titles[i]] = insight
+                    progress.progress(done / len(pending), text=f"Analyzed: {titles[i]}")
+
+            st.session_state.llm_traces.append(trace.to_dict())
+            progress.empty()
+
+        for idx, p in enumerate(items, start=offset):
+            render_paper(p, f"{year}_{idx}")
+
+def prefetch_candidates(result):
+    """
+    Papers on the first page of each year, most recent year first.
+    """
+    for year in result["summary"]["year"]:
+        if "store" in result:
+            yield from load_store_page(result["store"], year, 0, PAGE_SIZE)
+        else:
+            yield from result["timeline"][year][:PAGE_SIZE]
+
 # -------------------- SEARCH FORM -------------------- #
 with st.form("search_form"):
     topic = st.text_input(
         "🔍 Enter Research Topic",
         placeholder="e.g., Cyber Deception Techniques"
     )
+    refresh = st.checkbox("Refresh results (ignore cached analysis)")
+    expand_mode = st.checkbox("Expand through citation graph (adds influential papers)")
+    large_mode = st.checkbox("Large corpus mode (whole-field landscape)")
+    max_papers = st.number_input(
+        "Max papers (large corpus mode)",
+        min_value=1000,
+        max_value=50000,
+        value=5000,
+        step=1000
+    )
     submit = st.form_submit_button("Analyze")
 
 # -------------------- EXECUTION -------------------- #
@@ -329,70 +670,124 @@ if submit:
         st.warning("Please enter a research topic")
         st.stop()
 
+    # Speculative work for the previous query is no longer wanted
+    if st.session_state.prefetch:
+        st.session_state.prefetch.cancel()
+        st.session_state.prefetch = None
+
     agent = AURALitAgent()
+    live_preview = st.empty()
+    preview_papers = {}
+
+    def show_progress(year_counts, count, batch):
+        # Streamed preview as plain markdown, no widgets; the full
+        # timeline renders below once the run completes
+        for p in batch:
+            shown = preview_papers.setdefault(p["year"], [])
+            if len(shown) < PREVIEW_TITLES:
+                shown.append(p)
+
+        lines = [f"#### Retrieved {count:,} papers so far..."]
+        for year, n in year_counts.items():
+            lines.append(f"**📆 {year}** — {n:,} papers")
+            lines.extend(f"- [{p['title']}]({p['link']})" for p in preview_papers.get(year, []))
+            if n > PREVIEW_TITLES:
+                lines.append(f"- … and {n - PREVIEW_TITLES:,} more")
+
+        live_preview.markdown("\n".join(lines))
+
+    results = shared_results()
+
+    if large_mode:
+        result_key = ("large", normalize_query(topic), int(max_papers))
+        compute = lambda: agent.run_large(topic, int(max_papers), on_progress=show_progress)
+    else:
+        result_key = ("citations", normalize_query(topic)) if expand_mode else normalize_query(topic)
+        compute = lambda: agent.run(topic, on_progress=show_progress, expand_citations=expand_mode, refresh=refresh)
+
+    if refresh:
+        results.invalidate(result_key)
 
     with st.spinner("Analyzing research landscape..."):
-        st.session_state.result = agent.run(topic)
+        st.session_state.result = results.get_or_compute(result_key, compute)
+
+    # Never keep an empty result around; it usually means upstream failed
+    if not (st.session_state.result.get("papers") or st.session_state.result.get("papers_count")):
+        results.invalidate(result_key)
+    else:
+        st.session_state.prefetch = prefetcher().start(prefetch_candidates(st.session_state.result))
+
+    live_preview.empty()
 
 # -------------------- RESULTS -------------------- #
 if st.session_state.result:
 
     result = st.session_state.result
-    timeline = result["timeline"]
 
     with st.expander("🤖 Agent Reasoning"):
         for t in result["thoughts"]:
             st.write("•", t)
 
-    st.markdown("## 🕒 Research Evolution Timeline")
+        traces = [result["trace"]] + st.session_state.llm_traces
 
-    if not timeline:
-        st.info("No timeline available")
+        st.markdown("**Stage Timings**")
+        for trace in traces:
+            render_trace(trace)
 
-    else:
-        for year, items in timeline.items():
-
-            with st.expander(f"📆 {year} — {len(items)} papers"):
-
-                for idx, p in enumerate(items):
-
-                    paper_id = f"{year}_{idx}"
-
-                    # Paper Card
-                    st.markdown(f"""
-                    <div class="paper-card">
-                        <h4>{p['title']}</h4>
-                        <p style="color:#9ca3af; font-size:14px;">
-                            {p['authors']} | {p['source']}
-                        </p>
-                        <a href="{p['link']}" target="_blank" style="color:#4fd1c5;">
-                            📄 View Publication
-                        </a>
-                    </div>
-                    """, unsafe_allow_html=True)
+        st.download_button(
+            "Export Trace (OpenTelemetry JSON)",
+            data="\n".join(json.dumps(tracing.to_otlp(t)) for t in traces),
+            file_name="aura_lit_trace.jsonl",
+            mime="application/json"
+        )
 
-                    # Predict Button
-                    if st.button("Predict Contribution", key=f"btn_{paper_id}"):
+        if st.session_state.prefetch:
+            st.markdown("**Contribution Prefetch**")
+            st.write(st.session_state.prefetch.stats())
 
-                        if paper_id not in st.session_state.summaries:
-                            with st.spinner("Analyzing Research Contribution..."):
-                                insight = predict_contribution(p["title"])
-                                st.session_state.summaries[paper_id] = insight
+        st.markdown("**Caches**")
+        st.dataframe({"query results": query_cache_stats(), "LLM responses": llm_cache_stats()})
 
-                    # Summary Display
-                    if paper_id in st.session_state.summaries:
+        calls = llm_call_stats()
+        if calls["calls"]:
+            st.markdown("**LLM Calls**")
+            st.write(calls)
 
-                        data = st.session_state.summaries[paper_id]
+        limits = rate_limit.stats()
+        if limits:
+            st.markdown("**Upstream Rate Limits**")
+            st.dataframe({name: s for name, s in limits.items()})
 
-                        st.markdown('<div class="summary-card">', unsafe_allow_html=True)
-                        st.markdown("### Research Summary")
-                        st.write(data["paragraph"])
+    st.markdown("## 🕒 Research Evolution Timeline")
 
-                        col1, col2 = st.columns(2)
-                        col1.metric("Confidence Score", f"{data['confidence']}%")
-                        col2.metric("Innovation Level", data["novelty"])
+    summary = result["summary"]
 
-                        st.markdown("**Potential Impact**")
-                        st.write(data["impact"])
+    if not summary["year"]:
+        st.info("No timeline available")
 
-                        st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
+    else:
+        resolution = st.radio("Resolution", RESOLUTIONS, horizontal=True, key="timeline_resolution")
+        buckets = summary[resolution]
+
+        st.markdown(f"**{sum(b['count'] for b in summary['year'].values()):,} papers** across {len(summary['year'])} years")
+        st.bar_chart({"papers": {str(k): buckets[k]["count"] for k in reversed(list(buckets))}})
+
+        topics = result["trends"]["topics"]
+        if topics:
+            st.markdown("### 📈 Topic Trends")
+            st.line_chart({t["label"]: {str(y): s for y, s in t["shares"].items()} for t in topics})
+            st.dataframe(
+                [
+                    {"Topic": t["label"], "Papers": t["papers"], "Emerging": t["emerging"], "Share slope / year": t["slope"]}
+                    for t in topics
+                ],
+                hide_index=True
+            )
+
+        for year, stats in summary["year"].items():
+            if "store" in result:
+                load_page = lambda offset, size, year=year: load_store_page(result["store"], year, offset, size)
+            else:
+                load_page = lambda offset, size, items=result["timeline"][year]: items[offset:offset + size]
+
+            render_year(year, stats["count"], load_page, stats)
@@ -0,0 +1,403 @@
+"""
+Headless batch runner: refreshes research landscapes for many queries.
+
+Each query runs the fetch -> timeline -> trends -> contribution pipeline.
+Queries are spread over worker processes, each running several at once on
+threads, and every process draws on one shared token bucket per upstream
+so the batch as a whole stays within the configured rate limits. Results
+are written to SQLite as they finish, so an interrupted run resumes where
+it stopped.
+
+    python batch.py queries.txt --output landscapes.sqlite --processes 4 --threads 4
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import llm_client
+import rate_limit
+from cache import make_key, normalize_query
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+DEFAULT_PROCESSES = max(1, min(4, os.cpu_count() or 1))
+DEFAULT_THREADS = 4
+
+PAPERS_PER_QUERY = 100
+CONTRIBUTIONS_PER_QUERY = 5
+TRENDING_TOPICS = 5
+
+# Upstream counters summed from each query's trace into the run stats
+TRACE_COUNTERS = ("upstream_calls", "retries", "rate_limit_wait_ms", "cache_hits", "tokens")
+
+
+def read_queries(path):
+    """
+    One query per line; blank lines, '#' comments and repeats are skipped.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return list(dict.fromkeys(line for line in lines if line and not line.startswith("#")))
+
+
+def query_key(query, options):
+    return make_key(normalize_query(query), options["limit"], options["start_year"], options["contributions"])
+
+
+# =========================================================
+# RESULT STORE
+# =========================================================
+
+class ResultStore:
+    """
+    Batch results in SQLite, one row per query, with the landscape stored
+    as zlib-compressed JSON. The table doubles as the resume checkpoint:
+    every committed 'ok' row is skipped by the next run, while 'partial'
+    rows (some contributions fell back to canned text) are retried.
+
+    Args:
+        path (str): SQLite file to create or append to.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, query TEXT NOT NULL, status TEXT NOT NULL, "
+            "error TEXT, papers INTEGER, elapsed_s REAL, finished_at REAL, payload BLOB)"
+        )
+        self._conn.commit()
+
+    def completed(self):
+        return {key for key, in self._conn.execute("SELECT key FROM results WHERE status = 'ok'")}
+
+    def write(self, records):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results "
+                "(key, query, status, error, papers, elapsed_s, finished_at, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        r["key"], r["query"], r["status"], r.get("error"), r.get("papers"),
+                        r["elapsed_s"], time.time(),
+                        zlib.compress(json.dumps(r["landscape"], separators=(",", ":")).encode("utf-8"))
+                        if r.get("landscape") else None
+                    )
+                    for r in records
+                ]
+            )
+
+    def __iter__(self):
+        """
+        Yields:
+            dict: 'query', 'status', 'papers' and the decoded 'landscape'
+                  of every query that produced one ("ok" or "partial").
+        """
+        rows = self._conn.execute(
+            "SELECT query, status, papers, payload FROM results WHERE status IN ('ok', 'partial')"
+        )
+        for query, status, papers, payload in rows:
+            yield {
+                "query": query,
+                "status": status,
+                "papers": papers,
+                "landscape": json.loads(zlib.decompress(payload)) if payload else None
+            }
+
+    def close(self):
+        self._conn.close()
+
+
+# =========================================================
+# WORKERS
+# =========================================================
+
+def init_worker(buckets):
+    """
+    Points each worker process's rate limiters at the batch-wide budgets.
+    """
+    rate_limit.use_shared_buckets(buckets)
+
+
+def trace_counters(trace):
+    totals = dict.fromkeys(TRACE_COUNTERS, 0)
+    for s in trace["spans"]:
+        for name in TRACE_COUNTERS:
+            totals[name] += s["counters"].get(name, 0)
+    return totals
+
+
+def run_query(query, options):
+    """
+    Runs the full pipeline for one query in the bulk rate-limit lane.
+
+    Returns:
+        dict: 'status' is "ok", "partial" (some contributions are the
+              canned fallback), "empty" (nothing fetched) or "failed".
+    """
+    import tracing
+    from paper_fetcher import fetch_papers, refresh_papers
+    from paper_store import PaperTable
+    from summarizer import classify_domains, predict_contributions
+    from timeline_builder import TimelineBuilder
+    from trends import TrendAnalyzer
+
+    start = time.perf_counter()
+    record = {"key": query_key(query, options), "query": query}
+
+    try:
+        with rate_limit.priority(rate_limit.BULK), \
+                llm_client.budget(queue_timeout=options["llm_queue_timeout"]), \
+                tracing.start_trace("batch.query", query=query) as trace:
+
+            with tracing.span("fetch_papers"):
+                fetch = fetch_papers if options["use_cache"] else refresh_papers
+                papers = fetch(query, limit=options["limit"], start_year=options["start_year"])
+
+            if papers:
+                papers = PaperTable.from_papers(papers)
+
+                with tracing.span("classify_domains"):
+                    papers = papers.with_domains(classify_domains(papers))
+
+                with tracing.span("build_timeline"):
+                    builder = TimelineBuilder()
+                    builder.add(papers)
+
+                with tracing.span("topic_trends"):
+                    analyzer = TrendAnalyzer(query)
+                    analyzer.add(papers)
+                    topics = analyzer.trends()["topics"]
+
+                with tracing.span("predict_contributions"):
+                    top = sorted(
+                        papers, key=lambda p: (p["citation_count"] or 0, p["year"]), reverse=True
+                    )[:options["contributions"]]
+                    predictions = predict_contributions(
+                        [p["title"] for p in top], domains=[p["domains"] for p in top]
+                    )
+
+    except Exception as e:
+        record.update(status="failed", error=repr(e), elapsed_s=time.perf_counter() - start)
+        return record
+
+    record["elapsed_s"] = time.perf_counter() - start
+    record["counters"] = trace_counters(trace.to_dict())
+
+    if not papers:
+        record.update(status="empty", error="no papers fetched", papers=0)
+        return record
+
+    fallbacks = sum(prediction["source"] == "fallback" for prediction in predictions)
+
+    record.update(status="partial" if fallbacks else "ok", papers=len(papers))
+    if fallbacks:
+        record["error"] = f"{fallbacks} of {len(predictions)} contributions fell back to canned text"
+
+    record["landscape"] = {
+        "timeline": builder.summary("year"),
+        "trends": [
+            {k: t[k] for k in ("label", "terms", "papers", "emerging", "slope")}
+            for t in topics[:TRENDING_TOPICS]
+        ],
+        "contributions": [
+            {
+                "title": p["title"],
+                "year": p["year"],
+                "link": p["link"],
+                "paragraph": prediction["paragraph"],
+                "confidence": prediction["confidence"],
+                "novelty": prediction["novelty"],
+                "domains": prediction["domains"],
+                "source": prediction["source"]
+            }
+            for p, prediction in zip(top, predictions)
+        ]
+    }
+    return record
+
+
+def run_chunk(queries, options):
+    """
+    Runs a chunk of queries concurrently on threads within one process.
+    """
+    with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+        return list(pool.map(lambda q: run_query(q, options), queries))
+
+
+# =========================================================
+# DRIVER
+# =========================================================
+
+def percentile(sorted_samples, q):
+    return sorted_samples[round(q * (len(sorted_samples) - 1))] if sorted_samples else None
+
+
+def run_batch(queries, store, processes=DEFAULT_PROCESSES, threads=DEFAULT_THREADS, limit=PAPERS_PER_QUERY,
+              start_year=2000, contributions=CONTRIBUTIONS_PER_QUERY, use_cache=False, llm_queue_timeout=None,
+              on_result=None):
+    """
+    Runs every query not already completed in store.
+
+    Args:
+        queries (list of str): Queries to run.
+        store (ResultStore): Output and checkpoint.
+        processes (int): Worker processes.
+        threads (int): Queries run concurrently within each process.
+        use_cache (bool): Serve fresh query-cache entries instead of
+                          always fetching live.
+        llm_queue_timeout (float): Seconds a contribution may wait for
+            Groq quota; by default long enough for every contribution
+            the batch can have in flight at the configured rate.
+        on_result (callable): Called with each finished query's record.
+
+    Returns:
+        dict: Throughput and failure stats for the run.
+    """
+    if llm_queue_timeout is None:
+        groq_rate, _ = rate_limit.configured_limit("groq")
+        in_flight_calls = processes * threads * contributions
+        llm_queue_timeout = max(llm_client.BULK_QUEUE_TIMEOUT, 2 * in_flight_calls / groq_rate)
+
+    options = {
+        "limit": limit,
+        "start_year": start_year,
+        "contributions": contributions,
+        "use_cache": use_cache,
+        "threads": threads,
+        "llm_queue_timeout": llm_queue_timeout
+    }
+
+    done = store.completed()
+    pending = [q for q in queries if query_key(q, options) not in done]
+    chunks = [pending[i:i + threads] for i in range(0, len(pending), threads)]
+
+    # Created before the workers start so every process shares them
+    buckets = rate_limit.shared_buckets()
+
+    stats = {
+        "queries": len(queries),
+        "skipped": len(queries) - len(pending),
+        "ok": 0,
+        "partial": 0,
+        "empty": 0,
+        "failed": 0,
+        "papers": 0,
+        **dict.fromkeys(TRACE_COUNTERS, 0)
+    }
+    latencies = []
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_worker, initargs=(buckets,)) as pool:
+        remaining = iter(chunks)
+        in_flight = set()
+
+        try:
+            while True:
+                # Two chunks per process keeps workers busy without
+                # queueing the whole batch up front
+                for chunk in remaining:
+                    in_flight.add(pool.submit(run_chunk, chunk, options))
+                    if len(in_flight) >= processes * 2:
+                        break
+
+                if not in_flight:
+                    break
+
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    records = future.result()
+                    store.write(records)
+
+                    for r in records:
+                        stats[r["status"]] += 1
+                        stats["papers"] += r.get("papers") or 0
+                        for name, value in r.get("counters", {}).items():
+                            stats[name] += value
+                        latencies.append(r["elapsed_s"])
+
+                        if on_result:
+                            on_result(r)
+
+        except KeyboardInterrupt:
+            # Committed rows stay; the next run resumes after them
+            pool.shutdown(wait=False, cancel_futures=True)
+            stats["interrupted"] = True
+
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    stats["rate_limit_wait_ms"] = round(stats["rate_limit_wait_ms"], 1)
+    stats.update({
+        "elapsed_s": round(elapsed, 2),
+        "queries_per_min": round(60 * len(latencies) / elapsed, 2) if elapsed else None,
+        "papers_per_s": round(stats["papers"] / elapsed, 2) if elapsed else None,
+        "query_p50_s": round(percentile(latencies, 0.50), 3) if latencies else None,
+        "query_p95_s": round(percentile(latencies, 0.95), 3) if latencies else None
+    })
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("queries", help="File with one research query per line")
+    parser.add_argument("--output", default="landscapes.sqlite", help="Results and resume checkpoint")
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES)
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="Concurrent queries per process")
+    parser.add_argument("--limit", type=int, default=PAPERS_PER_QUERY, help="Papers fetched per query")
+    parser.add_argument("--start-year", type=int, default=2000)
+    parser.add_argument("--contributions", type=int, default=CONTRIBUTIONS_PER_QUERY,
+                        help="Most cited papers per query given an LLM contribution summary")
+    parser.add_argument("--use-cache", action="store_true",
+                        help="Reuse fresh cached search results instead of fetching live")
+    parser.add_argument("--stats-json", help="Also write the run stats to this file")
+    args = parser.parse_args()
+
+    queries = read_queries(args.queries)
+    store = ResultStore(args.output)
+
+    def report(record):
+        line = f"{record['status']:<6} {record['elapsed_s']:>7.2f}s  {record['query']}"
+        if record.get("error"):
+            line += f"  ({record['error']})"
+        print(line, flush=True)
+
+    try:
+        stats = run_batch(
+            queries,
+            store,
+            processes=args.processes,
+            threads=args.threads,
+            limit=args.limit,
+            start_year=args.start_year,
+            contributions=args.contributions,
+            use_cache=args.use_cache,
+            on_result=report
+        )
+    finally:
+        store.close()
+
+    print(json.dumps(stats, indent=2))
+
+    if args.stats_json:
+        with open(args.stats_json, "w") as f:
+            json.dump(stats, f, indent=2)
+
+    return 1 if stats["failed"] or stats["partial"] or stats.get("interrupted") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
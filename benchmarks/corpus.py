@@ -0,0 +1,98 @@
+"""
+Synthetic corpora expanded from the recorded upstream fixtures.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+SEMANTIC_SCHOLAR_TEMPLATES = json.loads(load_fixture("semantic_scholar_search.json"))["data"]
+ARXIV_FEED = load_fixture("arxiv_query.xml")
+ARXIV_ENTRIES = re.findall(r"<entry>.*?</entry>", ARXIV_FEED, flags=re.S)
+GROQ_COMPLETION = json.loads(load_fixture("groq_chat_completion.json"))
+
+
+def variant_year(base_year, i):
+    span = datetime.now().year - 2000 + 1
+    return 2000 + (base_year - 2000 + i) % span
+
+
+def semantic_scholar_records(n, offset=0):
+    """
+    Semantic Scholar search records offset..offset+n, cycling through the
+    recorded templates with unique titles and spread-out years.
+    """
+    records = []
+
+    for i in range(offset, offset + n):
+        template = SEMANTIC_SCHOLAR_TEMPLATES[i % len(SEMANTIC_SCHOLAR_TEMPLATES)]
+        record = dict(template)
+        record["paperId"] = f"{i:040x}"
+        record["title"] = f"{template['title']} (Study {i})"
+        record["year"] = variant_year(template["year"], i)
+        records.append(record)
+
+    return records
+
+
+def citation_records(paper_id, direction, n, corpus_size):
+    """
+    Neighbours of stand-in paper paper_id. Paper i cites papers i - k^2 - 1
+    and is cited by papers i + k^2 + 1, so both directions agree.
+    """
+    i = int(paper_id, 16)
+    sign = -1 if direction == "references" else 1
+    key = "citedPaper" if direction == "references" else "citingPaper"
+
+    return [
+        {key: semantic_scholar_records(1, (i + sign * (k * k + 1)) % corpus_size)[0]}
+        for k in range(min(n, corpus_size - 1))
+    ]
+
+
+def arxiv_feed(n):
+    """
+    An Atom feed with n entries built from the recorded arXiv entries.
+    """
+    entries = []
+
+    for i in range(n):
+        entry = ARXIV_ENTRIES[i % len(ARXIV_ENTRIES)]
+        entry = re.sub(
+            r"<title>(.*?)</title>",
+            lambda m: f"<title>{m.group(1)} (Preprint {i})</title>",
+            entry,
+            count=1,
+            flags=re.S
+        )
+        entries.append(entry)
+
+    head = ARXIV_FEED[:ARXIV_FEED.index("<entry>")]
+    return head + "\n  ".join(entries) + "\n</feed>\n"
+
+
+def papers(n):
+    """
+    n papers in the dict format paper_fetcher produces.
+    """
+    return [
+        {
+            "title": r["title"],
+            "authors": ", ".join(a["name"] for a in r["authors"][:3]),
+            "year": r["year"],
+            "abstract": (r.get("abstract") or "").replace("\n", " ").strip(),
+            "link": r["url"],
+            "source": "Semantic Scholar"
+        }
+        for r in semantic_scholar_records(n)
+    ]
@@ -0,0 +1,102 @@
+"""
+Cold-start import benchmark.
+
+Imports each module in a fresh interpreter several times, reports the
+median wall time and fails if a module exceeds its budget or pulls in
+a heavy dependency that should only load on first use.
+
+    python benchmarks/import_time.py --runs 7 --budget-ms 400
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["paper_fetcher", "summarizer", "timeline_builder", "agent"]
+
+# Must not be imported as a side effect of importing MODULES
+DEFERRED = ["groq", "torch", "transformers", "sentence_transformers", "sklearn", "spacy"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "loaded": [m for m in {deferred!r} if m in sys.modules]
+}}))
+"""
+
+
+def measure(module, runs):
+    timings = []
+    loaded = set()
+
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, deferred=DEFERRED)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["seconds"] * 1000)
+        loaded.update(result["loaded"])
+
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "max_ms": round(max(timings), 2),
+        "deferred_loaded": sorted(loaded)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=500.0)
+    parser.add_argument("--modules", nargs="*", default=MODULES)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    failed = False
+
+    for module in args.modules:
+        try:
+            result = measure(module, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{module}: import failed\n{e.stderr}", file=sys.stderr)
+            failed = True
+            continue
+
+        result["over_budget"] = result["median_ms"] > args.budget_ms
+        failed |= result["over_budget"] or bool(result["deferred_loaded"])
+        results.append(result)
+
+        print(
+            f"{module:<20} median {result['median_ms']:>8.1f} ms  "
+            f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f})"
+            + (f"  eager: {', '.join(result['deferred_loaded'])}" if result["deferred_loaded"] else "")
+            + ("  OVER BUDGET" if result["over_budget"] else "")
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"budget_ms": args.budget_ms, "results": results}, f, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Benchmarks for the fetch -> timeline -> summarize pipeline.
+
+Every upstream call is served by a local stand-in (stub_server.py) that
+replays the recorded fixtures, so runs are repeatable and never touch
+live services. Results are written as JSON for comparison between commits.
+
+    python benchmarks/run_benchmarks.py --sizes 10 100 1000 10000 100000 \
+        --latency-ms 20 --error-rate 0.02 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import papers as make_papers, semantic_scholar_records
+from stub_server import StubServer
+
+
+BENCHMARKS = ["fetch", "timeline", "classify", "predict", "citations"]
+
+# Semantic Scholar search cannot page past this many results
+MAX_FETCH_SIZE = 1000
+
+
+# =========================================================
+# MEASUREMENT
+# =========================================================
+
+def percentile(sorted_samples, q):
+    if not sorted_samples:
+        return None
+    idx = min(len(sorted_samples) - 1, max(0, round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[idx]
+
+
+def summarize(benchmark, size, latencies_s, items, total_s, errors=0):
+    """
+    Args:
+        latencies_s (list of float): One sample per measured operation.
+        items (int): Units of work processed, used for throughput.
+    """
+    ms = sorted(s * 1000 for s in latencies_s)
+
+    return {
+        "benchmark": benchmark,
+        "size": size,
+        "operations": len(ms),
+        "items": items,
+        "total_s": round(total_s, 6),
+        "throughput_per_s": round(items / total_s, 2) if total_s else None,
+        "p50_ms": round(percentile(ms, 0.50), 4) if ms else None,
+        "p95_ms": round(percentile(ms, 0.95), 4) if ms else None,
+        "p99_ms": round(percentile(ms, 0.99), 4) if ms else None,
+        "errors": errors
+    }
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+# =========================================================
+# BENCHMARKS
+# =========================================================
+
+def bench_fetch(paper_fetcher, size, repeat):
+    latencies = []
+    fetched = 0
+    errors = 0
+
+    for i in range(repeat):
+        papers, elapsed = timed(
+            paper_fetcher.fetch_papers_live, f"benchmark query {i}", limit=size, start_year=2000
+        )
+        latencies.append(elapsed)
+        fetched += len(papers)
+        errors += len(papers) < size
+
+    return summarize("fetch_papers", size, latencies, fetched, sum(latencies), errors)
+
+
+def bench_timeline(timeline_builder, papers, repeat):
+    latencies = []
+
+    for _ in range(repeat):
+        _, elapsed = timed(timeline_builder.build_timeline, papers)
+        latencies.append(elapsed)
+
+    return summarize("build_timeline", len(papers), latencies, len(papers) * repeat, sum(latencies))
+
+
+def bench_classify(summarizer, papers):
+    latencies = []
+
+    for p in papers:
+        start = time.perf_counter()
+        summarizer.infer_domains(p["title"])
+        summarizer.confidence_score(p["title"])
+        latencies.append(time.perf_counter() - start)
+
+    return summarize("infer_domains+confidence_score", len(papers), latencies, len(papers), sum(latencies))
+
+
+def bench_predict(summarizer, papers, run_id):
+    latencies = []
+    errors = 0
+
+    for p in papers:
+        # Unique titles so every call misses the LLM cache
+        result, elapsed = timed(summarizer.predict_contribution, f"{p['title']} [{run_id}]")
+        latencies.append(elapsed)
+        errors += result["paragraph"].startswith("This research appears to investigate")
+
+    return summarize("predict_contribution", len(papers), latencies, len(papers), sum(latencies), errors)
+
+
+def bench_citations(citation_graph, seeds, repeat):
+    """
+    Expansion from a cold graph cache, then repeats served from cached edges.
+    """
+    graph = citation_graph.CitationGraph(
+        path=os.path.join(tempfile.mkdtemp(prefix="aura-graph-"), "graph.sqlite")
+    )
+
+    _, cold = timed(citation_graph.expand_citations, seeds, seeds=len(seeds), depth=2, graph=graph)
+    fetches = graph.stats()["fetches"]
+
+    warm = []
+    for _ in range(repeat):
+        _, elapsed = timed(citation_graph.expand_citations, seeds, seeds=len(seeds), depth=2, graph=graph)
+        warm.append(elapsed)
+
+    return [
+        summarize("expand_citations_cold", len(seeds), [cold], fetches, cold),
+        summarize("expand_citations_cached", len(seeds), warm, len(warm), sum(warm),
+                  errors=graph.stats()["fetches"] - fetches)
+    ]
+
+
+# =========================================================
+# MAIN
+# =========================================================
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--max-llm-calls", type=int, default=200,
+                        help="Cap on predict_contribution calls per size")
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args()
+
+    server = StubServer(
+        corpus_size=max(args.sizes) * 2,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status
+    ).start()
+
+    # Configure before the modules under test read their settings
+    os.environ["AURA_CACHE_DIR"] = tempfile.mkdtemp(prefix="aura-bench-")
+    os.environ["AURA_SEMANTIC_SCHOLAR_URL"] = f"{server.url}/graph/v1/paper/search"
+    os.environ["AURA_SEMANTIC_SCHOLAR_PAPER_URL"] = f"{server.url}/graph/v1/paper"
+    os.environ["AURA_ARXIV_URL"] = f"{server.url}/api/query"
+    os.environ["GROQ_BASE_URL"] = server.url
+    os.environ["GROQ_API_KEY"] = "benchmark"
+    # The stand-in has no provider quota; limiters only need to stay out
+    # of the way unless a run injects 429s to exercise them
+    for upstream in ("SEMANTIC_SCHOLAR", "ARXIV", "GROQ"):
+        os.environ.setdefault(f"AURA_RATE_{upstream}", "1000")
+        os.environ.setdefault(f"AURA_BURST_{upstream}", "100")
+    sys.path.insert(0, ROOT)
+
+    import citation_graph
+    import paper_fetcher
+    import rate_limit
+    import summarizer
+    import timeline_builder
+
+    results = []
+    run_id = int(time.time())
+
+    try:
+        for size in args.sizes:
+            papers = make_papers(size)
+            first = len(results)
+
+            if "fetch" in args.benchmarks and size <= MAX_FETCH_SIZE:
+                results.append(bench_fetch(paper_fetcher, size, args.repeat))
+
+            if "timeline" in args.benchmarks:
+                results.append(bench_timeline(timeline_builder, papers, args.repeat))
+
+            if "classify" in args.benchmarks:
+                results.append(bench_classify(summarizer, papers))
+
+            if "predict" in args.benchmarks:
+                # Smaller corpora are prefixes of larger ones, so the salt
+                # includes the size to keep every size's titles unseen
+                results.append(bench_predict(summarizer, papers[:args.max_llm_calls], f"{run_id}-{size}"))
+
+            if "citations" in args.benchmarks and size <= MAX_FETCH_SIZE:
+                seeds = paper_fetcher.parse_semantic_scholar(semantic_scholar_records(min(size, 10)))
+                results.extend(bench_citations(citation_graph, seeds, args.repeat))
+
+            for r in results[first:]:
+                print(
+                    f"{r['benchmark']:<32} n={r['size']:<7} "
+                    f"{r['throughput_per_s'] or 0:>12.1f}/s  "
+                    f"p50 {r['p50_ms'] or 0:>9.3f} ms  p95 {r['p95_ms'] or 0:>9.3f} ms  "
+                    f"p99 {r['p99_ms'] or 0:>9.3f} ms  errors {r['errors']}"
+                )
+    finally:
+        server.stop()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency_ms": args.latency_ms,
+            "error_rate": args.error_rate,
+            "error_status": args.error_status,
+            "repeat": args.repeat,
+            "upstream_requests": server.requests,
+            "upstream_errors": server.errors,
+            "rate_limits": rate_limit.stats()
+        },
+        "results": results
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Local stand-in for Semantic Scholar (search and citation graph), arXiv and Groq.
+
+Serves responses expanded from the recorded fixtures, with configurable
+latency and error injection:
+
+    python benchmarks/stub_server.py --port 8765 --latency-ms 50 --error-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import GROQ_COMPLETION, arxiv_feed, citation_records, semantic_scholar_records
+
+
+# Semantic Scholar bulk search returns up to this many papers per call
+BULK_PAGE_SIZE = 1000
+
+
+def completion_stream():
+    """
+    The recorded completion as server-sent chunk events, one per word,
+    ending with Groq's usage block and the [DONE] sentinel.
+    """
+    content = GROQ_COMPLETION["choices"][0]["message"]["content"]
+    base = {k: GROQ_COMPLETION[k] for k in ("id", "created", "model", "system_fingerprint")}
+    base["object"] = "chat.completion.chunk"
+
+    def event(delta, finish_reason=None, **extra):
+        chunk = dict(base, choices=[{"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish_reason}], **extra)
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    words = content.split(" ")
+    events = [event({"role": "assistant", "content": ""})]
+    events += [event({"content": w if i == 0 else " " + w}) for i, w in enumerate(words)]
+    events.append(event({}, "stop", x_groq={"id": "req_bench", "usage": GROQ_COMPLETION["usage"]}))
+    events.append("data: [DONE]\n\n")
+    return "".join(events)
+
+
+class StubServer:
+    """
+    Args:
+        corpus_size (int): Papers the search endpoint pretends to hold.
+        latency_ms (float): Mean added response latency (±50% jitter).
+        error_rate (float): Fraction of requests answered with error_status.
+        error_status (int): 429 responses carry Retry-After: 0.
+    """
+
+    def __init__(self, corpus_size=1000, latency_ms=0.0, error_rate=0.0, error_status=429, port=0, seed=0):
+        self.corpus_size = corpus_size
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _delay_and_fail(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency_ms * self.random.uniform(0.5, 1.5) / 1000
+            fail = self.random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+
+        if delay:
+            time.sleep(delay)
+
+        return fail
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, *args):
+                pass
+
+            def send(self, status, body, content_type, headers=None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up first, e.g. a cancelled hedged request
+                    pass
+
+            def fail(self):
+                headers = {"Retry-After": "0"} if server.error_status == 429 else {}
+                self.send(server.error_status, json.dumps({"error": "injected"}), "application/json", headers)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+                if server._delay_and_fail():
+                    return self.fail()
+
+                if url.path.endswith("/paper/search"):
+                    offset = int(params.get("offset", 0))
+                    limit = int(params.get("limit", 100))
+                    n = max(0, min(limit, server.corpus_size - offset))
+                    body = {
+                        "total": server.corpus_size,
+                        "offset": offset,
+                        "data": semantic_scholar_records(n, offset)
+                    }
+                    return self.send(200, json.dumps(body), "application/json")
+
+                if url.path.endswith("/paper/search/bulk"):
+                    # The continuation token is simply the next offset
+                    offset = int(params.get("token", 0))
+                    n = max(0, min(BULK_PAGE_SIZE, server.corpus_size - offset))
+                    body = {
+                        "total": server.corpus_size,
+                        "token": str(offset + n) if offset + n < server.corpus_size else None,
+                        "data": semantic_scholar_records(n, offset)
+                    }
+                    return self.send(200, json.dumps(body), "application/json")
+
+                parts = url.path.rstrip("/").split("/")
+                if len(parts) >= 3 and parts[-3] == "paper" and parts[-1] in ("references", "citations"):
+                    limit = int(params.get("limit", 100))
+                    body = {"data": citation_records(parts[-2], parts[-1], limit, server.corpus_size)}
+                    return self.send(200, json.dumps(body), "application/json")
+
+                if url.path.endswith("/api/query"):
+                    start = int(params.get("start", 0))
+                    n = max(0, min(int(params.get("max_results", 10)), server.corpus_size - start))
+                    return self.send(200, arxiv_feed(n), "application/atom+xml")
+
+                self.send(404, "{}", "application/json")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+
+                if server._delay_and_fail():
+                    return self.fail()
+
+                if self.path.endswith("/chat/completions"):
+                    if request.get("stream"):
+                        return self.send(200, completion_stream(), "text/event-stream")
+                    return self.send(200, json.dumps(GROQ_COMPLETION), "application/json")
+
+                self.send(404, "{}", "application/json")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for upstream APIs")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--corpus-size", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    args = parser.parse_args()
+
+    server = StubServer(
+        corpus_size=args.corpus_size,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        port=args.port
+    )
+    print(f"Serving on {server.url}")
+    print(f"  AURA_SEMANTIC_SCHOLAR_URL={server.url}/graph/v1/paper/search")
+    print(f"  AURA_SEMANTIC_SCHOLAR_BULK_URL={server.url}/graph/v1/paper/search/bulk")
+    print(f"  AURA_ARXIV_URL={server.url}/api/query")
+    print(f"  GROQ_BASE_URL={server.url}")
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import tracing
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+CACHE_DIR = os.getenv("AURA_CACHE_DIR", ".aura_cache")
+
+
+def make_key(*parts):
+    """
+    Builds a stable cache key from JSON-serializable parts.
+    """
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def normalize_query(query):
+    return " ".join(str(query).lower().split())
+
+
+def paper_key(paper):
+    """
+    Identifies a paper by its normalized title across caches and indexes.
+    """
+    return make_key(normalize_query(paper.get("title") or ""))
+
+
+# =========================================================
+# PERSISTENT CACHE
+# =========================================================
+
+class DiskCache:
+    """
+    SQLite-backed key/value cache with TTL, LRU eviction and
+    stale-while-revalidate refresh.
+
+    Args:
+        path (str): SQLite file location.
+        ttl (float): Seconds an entry is served as fresh.
+        stale_ttl (float): Extra seconds an expired entry may still be
+            served while it is refreshed in the background.
+        max_entries (int): Entry count above which the least recently
+            used entries are evicted.
+    """
+
+    def __init__(self, path, ttl=3600, stale_ttl=86400, max_entries=1000):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "refreshes": 0
+        }
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+        )
+        self._conn.commit()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def get(self, key):
+        """
+        Looks up a key.
+
+        Returns:
+            tuple: (value, fresh). value is None on a miss or when the
+                   entry is past its stale window.
+        """
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._counters["misses"] += 1
+                tracing.add("cache_misses")
+                return None, False
+
+            value, created = row
+            age = now - created
+
+            if age > self.ttl + self.stale_ttl:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self._counters["misses"] += 1
+                tracing.add("cache_misses")
+                return None, False
+
+            self._conn.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+
+            fresh = age <= self.ttl
+            self._counters["hits" if fresh else "stale_hits"] += 1
+            tracing.add("cache_hits")
+
+        return json.loads(value), fresh
+
+    def set(self, key, value):
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+
+            overflow = self._conn.execute(
+                "SELECT COUNT(*) FROM entries"
+            ).fetchone()[0] - self.max_entries
+
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE key IN ("
+                    "SELECT key FROM entries ORDER BY accessed ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self._counters["evictions"] += overflow
+
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def get_or_set(self, key, compute):
+        """
+        Returns the cached value for key, computing and storing it on a miss.
+
+        Stale entries are returned immediately while compute() runs in a
+        background thread to refresh them. Falsy results are not stored.
+        """
+        value, fresh = self.get(key)
+
+        if value is not None:
+            if not fresh:
+                self.revalidate(key, compute)
+            return value
+
+        value = compute()
+        if value:
+            self.set(key, value)
+        return value
+
+    def revalidate(self, key, compute):
+        """
+        Refreshes key in a background thread unless a refresh is already
+        in flight.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = compute()
+                if value:
+                    self.set(key, value)
+                    self._count("refreshes")
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = self._conn.execute(
+                "SELECT COUNT(*) FROM entries"
+            ).fetchone()[0]
+
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        )
+        return stats
@@ -0,0 +1,386 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+import tracing
+from cache import CACHE_DIR
+from paper_fetcher import HEADERS, SEMANTIC_SCHOLAR_CONCURRENCY, SEMANTIC_SCHOLAR_FIELDS, parse_semantic_scholar
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+# Overridable so benchmarks can point at a local stand-in server
+SEMANTIC_SCHOLAR_PAPER_URL = os.getenv(
+    "AURA_SEMANTIC_SCHOLAR_PAPER_URL",
+    "https://api.semanticscholar.org/graph/v1/paper"
+)
+
+GRAPH_PATH = os.path.join(CACHE_DIR, "citation_graph.sqlite")
+
+DIRECTIONS = ("references", "citations")
+
+# Neighbours requested per paper and direction; all of them are cached,
+# only the most cited FAN_OUT are crawled further
+NEIGHBOUR_LIMIT = 100
+
+DEFAULT_DEPTH = 1
+DEFAULT_FAN_OUT = 10
+DEFAULT_SEEDS = 10
+
+# Hard cap on papers reached by one expansion
+MAX_NODES = 2000
+
+# A paper's references never change; its citations keep growing
+CITATIONS_TTL = int(os.getenv("AURA_CITATIONS_TTL", 7 * 24 * 3600))
+
+PAGERANK_ALPHA = 0.85
+
+
+def node_id(paper):
+    """
+    Semantic Scholar id for a paper, falling back to the DOI: and ARXIV:
+    forms the Graph API also accepts; None if the paper has neither.
+    """
+    if paper.get("paper_id"):
+        return paper["paper_id"]
+    if paper.get("arxiv_id"):
+        return f"ARXIV:{paper['arxiv_id']}"
+    if paper.get("doi"):
+        return f"DOI:{paper['doi']}"
+    return None
+
+
+# -------------------- Semantic Scholar -------------------- #
+
+def fetch_neighbours(paper_id, direction, limit=NEIGHBOUR_LIMIT):
+    """
+    Fetches the papers a paper cites ("references") or is cited by
+    ("citations").
+
+    Returns:
+        list of dict: Parsed papers, or None if the request failed.
+    """
+    key = "citedPaper" if direction == "references" else "citingPaper"
+
+    with tracing.span("semantic_scholar.graph", direction=direction) as graph_span:
+        try:
+            response = http_client.get(
+                f"{SEMANTIC_SCHOLAR_PAPER_URL}/{paper_id}/{direction}",
+                upstream="semantic_scholar",
+                headers=HEADERS,
+                params={"fields": SEMANTIC_SCHOLAR_FIELDS, "limit": limit},
+                timeout=10
+            )
+
+            graph_span.set("status", response.status_code)
+
+            if response.status_code != 200:
+                return None
+
+            data = [item.get(key) or {} for item in response.json().get("data") or []]
+
+        except Exception as e:
+            graph_span.set("error", repr(e))
+            return None
+
+    return [p for p in parse_semantic_scholar(data) if p["paper_id"]]
+
+
+# =========================================================
+# GRAPH CACHE
+# =========================================================
+
+class CitationGraph:
+    """
+    Persistent citation graph, grown incrementally by every expansion.
+
+    Edges (citing -> cited) and paper records live in SQLite; a networkx
+    DiGraph mirror is loaded on first use and kept in step with every
+    write. Each (paper, direction) is fetched from the network once and
+    served from the cache afterwards, until CITATIONS_TTL for citations.
+
+    Args:
+        path (str): SQLite file holding the graph.
+        max_workers (int): Concurrent neighbour fetches while crawling.
+    """
+
+    def __init__(self, path=GRAPH_PATH, max_workers=SEMANTIC_SCHOLAR_CONCURRENCY):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self.max_workers = max_workers
+        self._lock = threading.RLock()
+        self._graph = None
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            "id TEXT PRIMARY KEY, paper TEXT NOT NULL, citation_count INTEGER);"
+            "CREATE TABLE IF NOT EXISTS edges ("
+            "citing TEXT NOT NULL, cited TEXT NOT NULL, "
+            "PRIMARY KEY (citing, cited)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS expanded ("
+            "id TEXT NOT NULL, direction TEXT NOT NULL, fetched_at REAL NOT NULL, "
+            "PRIMARY KEY (id, direction)) WITHOUT ROWID;"
+        )
+        self._conn.commit()
+
+        self._counters = {"fetches": 0, "fetch_failures": 0, "cache_hits": 0}
+
+    @property
+    def graph(self):
+        """
+        The networkx mirror of every cached edge, with each paper's
+        citation count as a node attribute.
+        """
+        with self._lock:
+            if self._graph is None:
+                import networkx as nx
+
+                graph = nx.DiGraph()
+                graph.add_edges_from(self._conn.execute("SELECT citing, cited FROM edges"))
+                for paper_id, count in self._conn.execute("SELECT id, citation_count FROM papers"):
+                    graph.add_node(paper_id, citation_count=count)
+
+                self._graph = graph
+
+            return self._graph
+
+    def _store(self, source, direction, neighbours):
+        ids = [p["paper_id"] for p in neighbours]
+        edges = [(source, n) if direction == "references" else (n, source) for n in ids]
+
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO papers (id, paper, citation_count) VALUES (?, ?, ?)",
+                    [(p["paper_id"], json.dumps(p), p.get("citation_count")) for p in neighbours]
+                )
+                self._conn.executemany("INSERT OR IGNORE INTO edges (citing, cited) VALUES (?, ?)", edges)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO expanded (id, direction, fetched_at) VALUES (?, ?, ?)",
+                    (source, direction, time.time())
+                )
+
+            graph = self.graph
+            graph.add_edges_from(edges)
+            for p in neighbours:
+                graph.add_node(p["paper_id"], citation_count=p.get("citation_count"))
+
+    def _is_fresh(self, paper_id, direction):
+        row = self._conn.execute(
+            "SELECT fetched_at FROM expanded WHERE id = ? AND direction = ?", (paper_id, direction)
+        ).fetchone()
+        return row is not None and (direction == "references" or time.time() - row[0] < CITATIONS_TTL)
+
+    def add_papers(self, papers):
+        """
+        Records seed papers so they can be returned and ranked like
+        crawled ones; existing records are kept.
+        """
+        rows = [(node_id(p), json.dumps(p), p.get("citation_count")) for p in papers if node_id(p)]
+
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO papers (id, paper, citation_count) VALUES (?, ?, ?)", rows
+                )
+            for paper_id, _, count in rows:
+                if paper_id not in self.graph:
+                    self.graph.add_node(paper_id, citation_count=count)
+
+    def neighbours(self, paper_id, direction):
+        """
+        Ids of the papers on the other end of a paper's edges in one
+        direction, fetching them only if the cache has none fresh.
+
+        Returns:
+            list of str: Neighbour ids; empty if the fetch failed.
+        """
+        with self._lock:
+            cached = self._is_fresh(paper_id, direction)
+
+        if cached:
+            with self._lock:
+                self._counters["cache_hits"] += 1
+                graph = self.graph
+                if paper_id not in graph:
+                    return []
+                edges = graph.successors if direction == "references" else graph.predecessors
+                return list(edges(paper_id))
+
+        tracing.add("graph_fetches")
+        fetched = fetch_neighbours(paper_id, direction)
+
+        with self._lock:
+            if fetched is None:
+                self._counters["fetch_failures"] += 1
+                return []
+            self._counters["fetches"] += 1
+
+        self._store(paper_id, direction, fetched)
+        return [p["paper_id"] for p in fetched]
+
+    def crawl(self, seeds, depth=DEFAULT_DEPTH, fan_out=DEFAULT_FAN_OUT, directions=DIRECTIONS, max_nodes=MAX_NODES):
+        """
+        Breadth-first expansion from seed ids, one level at a time, with
+        every (paper, direction) lookup in a level fetched concurrently.
+
+        Args:
+            depth (int): Hops from the seeds.
+            fan_out (int): Most-cited neighbours followed per paper and
+                direction.
+            max_nodes (int): Stop once this many papers were reached.
+
+        Returns:
+            list of str: Reached ids in discovery order, seeds first.
+        """
+        reached = list(dict.fromkeys(seeds))
+        seen = set(reached)
+        frontier = reached
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for level in range(depth):
+                if not frontier or len(seen) >= max_nodes:
+                    break
+
+                with tracing.span("citation_graph.level", level=level, papers=len(frontier)):
+                    tasks = [(paper_id, direction) for paper_id in frontier for direction in directions]
+                    # Each task gets its own context; one Context cannot run concurrently
+                    futures = [
+                        pool.submit(tracing.propagate(self.neighbours), paper_id, direction)
+                        for paper_id, direction in tasks
+                    ]
+
+                    frontier = []
+                    for future in futures:
+                        for paper_id in self.top_cited(future.result(), fan_out):
+                            if paper_id not in seen and len(seen) < max_nodes:
+                                seen.add(paper_id)
+                                reached.append(paper_id)
+                                frontier.append(paper_id)
+
+        return reached
+
+    def top_cited(self, paper_ids, n):
+        with self._lock:
+            nodes = self.graph.nodes
+            return sorted(paper_ids, key=lambda i: nodes[i].get("citation_count") or 0, reverse=True)[:n]
+
+    def rank(self, paper_ids, seeds=(), method="pagerank"):
+        """
+        Scores papers by PageRank over the citation subgraph they induce,
+        personalized towards the seeds so scores reflect the query, or by
+        raw citation count.
+
+        Returns:
+            dict: Score per paper id.
+        """
+        import networkx as nx
+
+        with self._lock:
+            subgraph = self.graph.subgraph(paper_ids).copy()
+
+        if method == "pagerank" and subgraph.number_of_edges():
+            personalization = {s: 1.0 for s in seeds if s in subgraph} or None
+            try:
+                return nx.pagerank(subgraph, alpha=PAGERANK_ALPHA, personalization=personalization)
+            except nx.PowerIterationFailedConvergence:
+                pass
+
+        return {i: subgraph.nodes[i].get("citation_count") or 0 for i in subgraph}
+
+    def papers(self, paper_ids):
+        """
+        Returns:
+            dict: Stored paper record per id that has one.
+        """
+        records = {}
+        ids = list(paper_ids)
+
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT id, paper FROM papers WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                )
+                records.update((paper_id, json.loads(paper)) for paper_id, paper in rows)
+
+        return records
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["papers"] = self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+            stats["edges"] = self._conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+        return stats
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_graph():
+    global _graph
+
+    with _graph_lock:
+        if _graph is None:
+            _graph = CitationGraph()
+        return _graph
+
+
+# =========================================================
+# EXPANSION
+# =========================================================
+
+def expand_citations(papers, seeds=DEFAULT_SEEDS, depth=DEFAULT_DEPTH, fan_out=DEFAULT_FAN_OUT,
+                     limit=50, method="pagerank", start_year=None, graph=None):
+    """
+    Finds influential papers around a keyword search result by crawling
+    the citation graph from its leading papers.
+
+    Args:
+        papers (list of dict): Search results, most relevant first.
+        seeds (int): Leading papers to expand from.
+        limit (int): Most new papers returned.
+        method (str): "pagerank" or "citations".
+        start_year (int): Drop papers published earlier.
+
+    Returns:
+        list of dict: Papers not among the seeds, best first, each with
+                      its ranking 'score'.
+    """
+    graph = graph or get_graph()
+
+    seed_papers = [p for p in papers if node_id(p)][:seeds]
+    seed_ids = [node_id(p) for p in seed_papers]
+    if not seed_ids:
+        return []
+
+    with tracing.span("citation_graph.expand", seeds=len(seed_ids), depth=depth) as expand_span:
+        graph.add_papers(seed_papers)
+        reached = graph.crawl(seed_ids, depth=depth, fan_out=fan_out)
+        scores = graph.rank(reached, seeds=seed_ids, method=method)
+
+        seed_set = set(seed_ids)
+        candidates = sorted((i for i in reached if i in scores and i not in seed_set), key=scores.get, reverse=True)
+        records = graph.papers(candidates)
+
+        expanded = []
+        for paper_id in candidates:
+            paper = records.get(paper_id)
+            if paper is None or (start_year and paper["year"] < start_year):
+                continue
+            expanded.append(dict(paper, score=scores[paper_id]))
+            if len(expanded) >= limit:
+                break
+
+        expand_span.set("reached", len(reached))
+        expand_span.set("papers", len(expanded))
+
+    return expanded
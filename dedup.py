@@ -0,0 +1,256 @@
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+# Byte n-gram size for title shingles; shingles() packs exactly 4 bytes
+SHINGLE_SIZE = 4
+
+# MinHash signature length, split into LSH bands of NUM_PERM / BANDS rows.
+# 16 bands of 4 rows make titles at Jaccard 0.8 candidates with
+# probability > 0.999, while unrelated titles rarely share a bucket.
+NUM_PERM = 64
+BANDS = 16
+
+# Shingle Jaccard similarity at which two titles are the same paper
+SIMILARITY_THRESHOLD = 0.8
+
+# Preprints and their published versions are often a year or two apart
+MAX_YEAR_GAP = 2
+
+_PRIME = (1 << 31) - 1
+
+_rng = np.random.default_rng(20240917)
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_NUMBER = re.compile(r"\d+")
+
+_ARXIV_ID = re.compile(r"(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?$", re.IGNORECASE)
+
+
+# =========================================================
+# NORMALIZATION
+# =========================================================
+
+def normalize_title(title):
+    """
+    Case-, accent- and punctuation-insensitive form of a title.
+    """
+    text = str(title or "")
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    text = _NON_WORD.sub(" ", text.lower())
+    return " ".join(text.split())
+
+
+def normalize_doi(doi):
+    if not doi:
+        return None
+    doi = str(doi).strip().lower()
+    for prefix in ("https://doi.org/", "http://doi.org/", "http://dx.doi.org/", "doi:"):
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi or None
+
+
+def parse_arxiv_id(value):
+    """
+    Version-less arXiv identifier from an id or abs/pdf URL, if any.
+    """
+    if not value:
+        return None
+    match = _ARXIV_ID.search(str(value).strip().rstrip("/"))
+    return match.group(1).lower() if match else None
+
+
+def title_numbers(normalized):
+    """
+    Numbers in a title ("GPT-3", "Part 2", "2019"); titles that differ
+    only in these are distinct papers however similar the rest is.
+    """
+    return tuple(sorted(set(_NUMBER.findall(normalized))))
+
+
+def shingles(normalized):
+    """
+    Sorted unique ids of the title's 4-byte n-grams. Each window of the
+    UTF-8 bytes is packed into one uint32, so no per-gram hashing is needed.
+    """
+    data = np.frombuffer(normalized.encode("utf-8").ljust(SHINGLE_SIZE), dtype=np.uint8).astype(np.uint32)
+    windows = len(data) - SHINGLE_SIZE + 1
+    grams = (data[:windows] << 24) | (data[1:windows + 1] << 16) | (data[2:windows + 2] << 8) | data[3:windows + 3]
+    return np.unique(grams % _PRIME)
+
+
+def minhash(shingle_hashes):
+    """
+    MinHash signature using NUM_PERM universal hashes, evaluated as one
+    (NUM_PERM x shingles) array operation.
+    """
+    hashed = (_A[:, None] * shingle_hashes.astype(np.uint64)[None, :] + _B[:, None]) % _PRIME
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def jaccard(a, b):
+    intersection = len(np.intersect1d(a, b, assume_unique=True))
+    return intersection / (len(a) + len(b) - intersection)
+
+
+# =========================================================
+# MERGING
+# =========================================================
+
+def merge_records(canonical, duplicate):
+    """
+    Folds a duplicate's metadata into the canonical record in place,
+    filling gaps and preferring the more complete value.
+    """
+    for key in ("doi", "arxiv_id", "paper_id", "citation_count", "month", "domains"):
+        if not canonical.get(key) and duplicate.get(key):
+            canonical[key] = duplicate[key]
+
+    for key in ("abstract", "authors"):
+        if len(duplicate.get(key) or "") > len(canonical.get(key) or ""):
+            canonical[key] = duplicate[key]
+
+    if canonical.get("link") in (None, "", "#") and duplicate.get("link"):
+        canonical["link"] = duplicate["link"]
+
+
+# =========================================================
+# INDEX
+# =========================================================
+
+class DedupIndex:
+    """
+    Near-duplicate detector for papers arriving from several sources.
+
+    A paper is a duplicate of an earlier one when they share a DOI or
+    arXiv id, or when their normalized titles match exactly or by shingle
+    similarity (found through MinHash LSH buckets, so each lookup costs
+    the same however many papers are indexed) with the same numbers, and
+    their years are close.
+
+    Args:
+        threshold (float): Shingle Jaccard similarity for a title match.
+        keep_records (bool): Keep canonical records so duplicates can be
+            merged into them. Disable when records are written out as
+            they arrive and only detection is needed.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, keep_records=True):
+        self.threshold = threshold
+        self.keep_records = keep_records
+
+        self._lock = threading.Lock()
+        self._records = []
+        self._years = []
+        self._shingles = []
+        self._titles = {}
+        self._ids = {}
+        self._buckets = {}
+        self._counters = {"papers": 0, "duplicates": 0, "id_matches": 0, "title_matches": 0, "fuzzy_matches": 0}
+
+    def _identifiers(self, paper):
+        ids = []
+        doi = normalize_doi(paper.get("doi"))
+        if doi:
+            ids.append(("doi", doi))
+        arxiv_id = paper.get("arxiv_id")
+        if arxiv_id:
+            ids.append(("arxiv", arxiv_id))
+        return ids
+
+    def _close_year(self, idx, year):
+        return abs((self._years[idx] or 0) - (year or 0)) <= MAX_YEAR_GAP
+
+    def _find(self, ids, normalized, year, sig_shingles, bands):
+        for identifier in ids:
+            idx = self._ids.get(identifier)
+            if idx is not None:
+                return idx, "id_matches"
+
+        for idx in self._titles.get(normalized, ()):
+            if self._close_year(idx, year):
+                return idx, "title_matches"
+
+        candidates = set()
+        for band in bands:
+            candidates.update(self._buckets.get(band, ()))
+
+        for idx in sorted(candidates):
+            if self._close_year(idx, year) and jaccard(sig_shingles, self._shingles[idx]) >= self.threshold:
+                return idx, "fuzzy_matches"
+
+        return None, None
+
+    def add(self, paper):
+        """
+        Indexes a paper unless it duplicates one already seen, in which
+        case its metadata is merged into the canonical record.
+
+        Returns:
+            bool: True if the paper is new, False for a duplicate.
+        """
+        normalized = normalize_title(paper.get("title"))
+        year = paper.get("year")
+        ids = self._identifiers(paper)
+        sig_shingles = shingles(normalized)
+        signature = minhash(sig_shingles)
+        numbers = title_numbers(normalized)
+        rows = NUM_PERM // BANDS
+        bands = [(b, numbers, signature[b * rows:(b + 1) * rows].tobytes()) for b in range(BANDS)]
+
+        with self._lock:
+            self._counters["papers"] += 1
+            idx, kind = self._find(ids, normalized, year, sig_shingles, bands)
+
+            if idx is not None:
+                self._counters["duplicates"] += 1
+                self._counters[kind] += 1
+
+                for identifier in ids:
+                    self._ids.setdefault(identifier, idx)
+
+                if self.keep_records:
+                    merge_records(self._records[idx], paper)
+
+                return False
+
+            idx = len(self._years)
+            self._records.append(paper if self.keep_records else None)
+            self._years.append(year)
+            self._shingles.append(sig_shingles)
+            self._titles.setdefault(normalized, []).append(idx)
+
+            for identifier in ids:
+                self._ids.setdefault(identifier, idx)
+
+            for band in bands:
+                self._buckets.setdefault(band, []).append(idx)
+
+        return True
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+def dedupe(papers, threshold=SIMILARITY_THRESHOLD):
+    """
+    Collapses near-duplicates, merging each into its first occurrence.
+
+    Returns:
+        list of dict: Canonical records in first-seen order.
+    """
+    index = DedupIndex(threshold)
+    return [p for p in papers if index.add(p)]
@@ -0,0 +1,137 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import rate_limit
+import tracing
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 10
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+# =========================================================
+# SHARED SESSIONS
+# =========================================================
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(name="default"):
+    """
+    Returns the process-wide keep-alive session for an upstream.
+
+    Each upstream gets its own bounded connection pool so one slow
+    provider cannot starve connections meant for another.
+    """
+    with _sessions_lock:
+        session = _sessions.get(name)
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                pool_block=True
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[name] = session
+
+        return session
+
+
+# =========================================================
+# BACKOFF
+# =========================================================
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header given either as seconds or an HTTP date.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt, retry_after=None):
+    """
+    Exponential backoff with full jitter, never shorter than Retry-After.
+    """
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, BACKOFF_MAX))
+
+    return delay
+
+
+# =========================================================
+# REQUESTS
+# =========================================================
+
+def get(url, upstream="default", params=None, headers=None, timeout=10, max_retries=MAX_RETRIES):
+    """
+    Issues a GET through the pooled session for `upstream`, retrying
+    connection errors and retryable status codes. Every attempt waits for
+    the upstream's rate limiter in the caller's priority lane.
+
+    Returns:
+        requests.Response: The final response, which may still carry a
+                           non-200 status once retries are exhausted.
+
+    Raises:
+        requests.RequestException: If every attempt failed to connect.
+    """
+    session = get_session(upstream)
+
+    for attempt in range(max_retries + 1):
+
+        if attempt:
+            tracing.add("retries")
+
+        rate_limit.acquire(upstream)
+        tracing.add("upstream_calls")
+
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+
+        except requests.RequestException:
+            if attempt == max_retries:
+                raise
+            time.sleep(retry_delay(attempt))
+            continue
+
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        rate_limit.feedback(upstream, response.status_code, retry_after)
+
+        if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+            tracing.add("bytes", len(response.content))
+            return response
+
+        response.close()
+        time.sleep(retry_delay(attempt, retry_after))
@@ -0,0 +1,347 @@
+import contextvars
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import http_client
+import rate_limit
+import tracing
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+# Longest an interactive call takes end to end, waiting for Groq quota
+# included, before falling back
+LLM_DEADLINE = float(os.getenv("AURA_LLM_DEADLINE", 8.0))
+
+# A call whose quota wait would leave the request less than this falls
+# back instead of spending the token on an answer that cannot finish
+LLM_MIN_REQUEST_TIME = 2.0
+
+# One paragraph; also bounds how long a completion can run
+LLM_MAX_TOKENS = int(os.getenv("AURA_LLM_MAX_TOKENS", 350))
+
+# Quota wait that bulk and speculative callers ask for through budget();
+# it is kept apart from the deadline, which then covers only the request
+BULK_QUEUE_TIMEOUT = float(os.getenv("AURA_LLM_BULK_QUEUE_TIMEOUT", 60.0))
+
+# A second request is sent when the first token takes longer than the
+# recent p95, or this long until enough samples exist
+HEDGE_DEFAULT_DELAY = 2.0
+HEDGE_MIN_SAMPLES = 20
+
+LATENCY_SAMPLES = 500
+
+_budget = contextvars.ContextVar("aura_lit_llm_budget", default={})
+
+
+@contextmanager
+def budget(deadline=None, queue_timeout=None):
+    """
+    Overrides the deadline and quota wait of every completion in the
+    with-block, e.g. for batch work that can wait far longer than a click.
+    With a queue_timeout the quota wait no longer counts against the
+    deadline.
+    Worker threads started through tracing.propagate inherit it.
+    """
+    overrides = {k: v for k, v in (("deadline", deadline), ("queue_timeout", queue_timeout)) if v is not None}
+    token = _budget.set({**_budget.get(), **overrides})
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+
+
+# =========================================================
+# GROQ CLIENT
+# =========================================================
+
+# Constructed on first use so imports and Streamlit reruns never pay
+# for the SDK import or client setup
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from groq import Groq
+                # No SDK retries: each one would bypass the rate limiter
+                # and its Retry-After handling
+                _client = Groq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0)
+
+    return _client
+
+
+# =========================================================
+# METRICS
+# =========================================================
+
+_metrics_lock = threading.Lock()
+_first_token_s = deque(maxlen=LATENCY_SAMPLES)
+_latency_s = deque(maxlen=LATENCY_SAMPLES)
+_counters = {
+    "calls": 0,
+    "completed": 0,
+    "hedged": 0,
+    "hedge_wins": 0,
+    "deadline_fallbacks": 0,
+    "queue_timeouts": 0,
+    "errors": 0,
+    "tokens": 0
+}
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[round(q * (len(ordered) - 1))] if ordered else None
+
+
+def hedge_delay():
+    with _metrics_lock:
+        if len(_first_token_s) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return _percentile(_first_token_s, 0.95)
+
+
+def _record(outcome, first_token=None, latency=None, tokens=0, hedged=False, hedge_won=False):
+    with _metrics_lock:
+        _counters["calls"] += 1
+        _counters[outcome] += 1
+        _counters["hedged"] += hedged
+        _counters["hedge_wins"] += hedge_won
+        _counters["tokens"] += tokens
+
+        if first_token is not None:
+            _first_token_s.append(first_token)
+        if latency is not None and outcome == "completed":
+            _latency_s.append(latency)
+
+
+def stats():
+    with _metrics_lock:
+        stats = dict(_counters)
+        for name, samples in (("first_token", _first_token_s), ("latency", _latency_s)):
+            for q in (50, 95):
+                value = _percentile(samples, q / 100)
+                stats[f"{name}_p{q}_ms"] = round(value * 1000, 1) if value is not None else None
+    return stats
+
+
+# =========================================================
+# STREAMING COMPLETION
+# =========================================================
+
+def _stream_attempt(attempt, prompt, model, temperature, max_tokens, timeout, cancel, events):
+    """
+    One streamed request, sent with a Groq token already held; reports
+    ("token", text), ("done", tokens) or ("error", None) events tagged
+    with the attempt number.
+    """
+    tracing.add("upstream_calls")
+
+    try:
+        stream = get_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            timeout=timeout
+        )
+
+        tokens = 0
+
+        try:
+            for chunk in stream:
+                if cancel.is_set():
+                    return
+
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    events.put((attempt, "token", delta))
+
+                usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+                if usage:
+                    tokens = usage.total_tokens
+        finally:
+            stream.close()
+
+        rate_limit.feedback("groq", 200)
+        events.put((attempt, "done", tokens))
+
+    except Exception as e:
+        # Groq's APIStatusError carries the HTTP response
+        status = getattr(e, "status_code", None)
+        if status:
+            headers = getattr(getattr(e, "response", None), "headers", None) or {}
+            rate_limit.feedback("groq", status, http_client.parse_retry_after(headers.get("retry-after")))
+        events.put((attempt, "error", None))
+
+
+def complete(prompt, model, temperature, on_token=None, deadline=None, max_tokens=LLM_MAX_TOKENS,
+             queue_timeout=None):
+    """
+    Streams a chat completion under a latency SLO.
+
+    The Groq rate limiter is waited on first, within the deadline unless
+    a separate queue_timeout is given; the hedge timer and latency
+    samples start once the request is actually sent, so local queueing is
+    never mistaken for upstream slowness. If no token
+    has arrived by the hedge delay (the recent p95 time to first token)
+    an identical second request is sent, but only when quota is free
+    right away, and whichever starts streaming first is used while the
+    other is cancelled. Token callbacks run on the calling thread, so
+    they may update UI elements.
+
+    Args:
+        on_token (callable): Called with the text so far as it grows.
+        deadline (float): Seconds until the call gives up, quota wait
+                          included unless queue_timeout is set;
+                          LLM_DEADLINE unless set here or by budget().
+        max_tokens (int): Output token cap.
+        queue_timeout (float): Seconds to wait for Groq quota before the
+                               deadline starts; unset here and in
+                               budget(), the wait is part of the deadline.
+
+    Returns:
+        str or None: The full completion, or None if it failed or missed
+                     the deadline; partial output is never returned.
+    """
+    overrides = _budget.get()
+    if deadline is None:
+        deadline = overrides.get("deadline", LLM_DEADLINE)
+    if queue_timeout is None:
+        queue_timeout = overrides.get("queue_timeout")
+
+    events = queue.Queue()
+    cancels = []
+
+    def launch():
+        # The caller already holds a rate-limit token for this attempt
+        cancel = threading.Event()
+        cancels.append(cancel)
+        threading.Thread(
+            target=tracing.propagate(_stream_attempt),
+            args=(len(cancels) - 1, prompt, model, temperature, max_tokens,
+                  max(0.1, start + deadline - time.monotonic()), cancel, events),
+            daemon=True
+        ).start()
+
+    def hedge():
+        # A hedge never queues: when quota is short it would only compete
+        # with the request it is meant to back up
+        if not rate_limit.acquire("groq", timeout=0):
+            return False
+        launch()
+        return True
+
+    owner = None
+    failed = set()
+    parts = []
+    first_token = None
+    tokens = 0
+    result = None
+    outcome = "deadline_fallbacks"
+
+    hedge_tried = False
+
+    with tracing.span("llm.complete", model=model, max_tokens=max_tokens) as call_span:
+        queued = time.monotonic()
+        wait = queue_timeout if queue_timeout is not None else max(0.0, deadline - LLM_MIN_REQUEST_TIME)
+
+        if not rate_limit.acquire("groq", timeout=wait):
+            call_span.set("outcome", "queue_timeouts")
+            _record("queue_timeouts")
+            return None
+
+        start = time.monotonic()
+        if queue_timeout is None:
+            # One deadline covers the quota wait and the request
+            deadline -= start - queued
+        hedge_at = start + min(hedge_delay(), deadline / 2)
+        launch()
+
+        try:
+            while True:
+                now = time.monotonic()
+                remaining = start + deadline - now
+                if remaining <= 0:
+                    break
+
+                can_hedge = owner is None and not hedge_tried
+                wait = min(remaining, max(0.0, hedge_at - now)) if can_hedge else remaining
+
+                try:
+                    attempt, kind, payload = events.get(timeout=wait)
+                except queue.Empty:
+                    if can_hedge and time.monotonic() >= hedge_at:
+                        hedge_tried = True
+                        hedge()
+                    continue
+
+                if kind == "error":
+                    failed.add(attempt)
+                    if attempt == owner:
+                        outcome = "errors"
+                        break
+                    if can_hedge:
+                        # The first attempt failed outright; hedge at once
+                        hedge_tried = True
+                        if hedge():
+                            continue
+                    if len(failed) == len(cancels):
+                        outcome = "errors"
+                        break
+                    continue
+
+                if owner is None:
+                    owner = attempt
+                    first_token = time.monotonic() - start
+                    for i, cancel in enumerate(cancels):
+                        if i != owner:
+                            cancel.set()
+
+                if attempt != owner:
+                    continue
+
+                if kind == "token":
+                    parts.append(payload)
+                    if on_token:
+                        on_token("".join(parts))
+
+                elif kind == "done":
+                    result = "".join(parts).strip() or None
+                    outcome = "completed" if result else "errors"
+                    tokens = payload
+                    tracing.add("tokens", tokens)
+                    break
+        finally:
+            for cancel in cancels:
+                cancel.set()
+
+        latency = time.monotonic() - start
+
+        call_span.set("outcome", outcome)
+        call_span.set("hedged", len(cancels) > 1)
+        if first_token is not None:
+            call_span.set("first_token_ms", round(first_token * 1000, 1))
+
+    _record(
+        outcome,
+        first_token=first_token,
+        latency=latency,
+        tokens=tokens,
+        hedged=len(cancels) > 1,
+        hedge_won=owner is not None and owner > 0
+    )
+
+    return result
@@ -1,8 +1,56 @@
-import requests
-import time
+import os
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import feedparser
 
+import http_client
+import tracing
+from cache import CACHE_DIR, DiskCache, make_key, normalize_query
+from dedup import DedupIndex, parse_arxiv_id
+
+
+# Overridable so benchmarks can point at a local stand-in server
+SEMANTIC_SCHOLAR_URL = os.getenv(
+    "AURA_SEMANTIC_SCHOLAR_URL",
+    "https://api.semanticscholar.org/graph/v1/paper/search"
+)
+SEMANTIC_SCHOLAR_BULK_URL = os.getenv(
+    "AURA_SEMANTIC_SCHOLAR_BULK_URL",
+    "https://api.semanticscholar.org/graph/v1/paper/search/bulk"
+)
+ARXIV_URL = os.getenv("AURA_ARXIV_URL", "http://export.arxiv.org/api/query")
+
+SEMANTIC_SCHOLAR_FIELDS = "paperId,title,authors,year,publicationDate,abstract,url,externalIds,citationCount"
+
+# Semantic Scholar search rejects offset + limit beyond this window
+SEMANTIC_SCHOLAR_MAX_OFFSET = 1000
+
+# Large-corpus paging; spacing between arXiv calls is left to its
+# rate limiter (one request per 3 s, as arXiv asks)
+ARXIV_PAGE_SIZE = 1000
+LARGE_CORPUS_MAX_PAPERS = 50000
+
+# Per-source concurrency limits
+SEMANTIC_SCHOLAR_CONCURRENCY = 3
+ARXIV_CONCURRENCY = 1
+
+# Query result cache
+QUERY_CACHE_TTL = int(os.getenv("AURA_QUERY_CACHE_TTL", 6 * 3600))
+QUERY_CACHE_STALE_TTL = int(os.getenv("AURA_QUERY_CACHE_STALE_TTL", 7 * 24 * 3600))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("AURA_QUERY_CACHE_MAX_ENTRIES", 2000))
+
+query_cache = DiskCache(
+    os.path.join(CACHE_DIR, "queries.sqlite"),
+    ttl=QUERY_CACHE_TTL,
+    stale_ttl=QUERY_CACHE_STALE_TTL,
+    max_entries=QUERY_CACHE_MAX_ENTRIES
+)
+
+HEADERS = {
+    "User-Agent": "AURA-Lit-Agent",
+    "Accept": "application/json"
+}
+
 
 def clean_text(text):
     if not text:
@@ -10,121 +58,418 @@ def clean_text(text):
     return str(text).replace("\n", " ").strip()
 
 
-def fetch_papers(query, limit=25, start_year=2000):
-
-    papers = []
-    seen_titles = set()
-    current_year = datetime.now().year
+# -------------------- Semantic Scholar -------------------- #
 
-    # -------------------- Semantic Scholar -------------------- #
-    url = "https://api.semanticscholar.org/graph/v1/paper/search"
+def fetch_semantic_scholar_page(query, offset, batch_size=100):
+    """
+    Fetches one page of Semantic Scholar search results.
 
-    headers = {
-        "User-Agent": "AURA-Lit-Agent",
-        "Accept": "application/json"
+    Returns:
+        list of dict: Parsed papers, or None if the request failed.
+    """
+    params = {
+        "query": query,
+        "limit": batch_size,
+        "offset": offset,
+        "fields": SEMANTIC_SCHOLAR_FIELDS
     }
 
-    offset = 0
-    batch_size = 100
+    with tracing.span("semantic_scholar.page", offset=offset) as page_span:
+        try:
+            response = http_client.get(
+                SEMANTIC_SCHOLAR_URL,
+                upstream="semantic_scholar",
+                headers=HEADERS,
+                params=params,
+                timeout=10
+            )
+
+            page_span.set("status", response.status_code)
+
+            if response.status_code != 200:
+                return None
+
+            data = response.json().get("data", [])
+
+        except Exception as e:
+            page_span.set("error", repr(e))
+            return None
+
+    return parse_semantic_scholar(data)
+
+
+def publication_month(date):
+    """
+    Month of an ISO date string ("2021-06-15..."), or None if unknown.
+    """
+    try:
+        return int(date[5:7])
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_semantic_scholar(data):
+    papers = []
 
-    while len(papers) < limit:
+    for p in data:
+
+        title = p.get("title")
+        year = p.get("year")
+        external_ids = p.get("externalIds") or {}
+
+        if not title or not year:
+            continue
+
+        papers.append({
+            "title": title,
+            "authors": ", ".join(
+                [a["name"] for a in p.get("authors", [])[:3]]
+            ),
+            "year": year,
+            "month": publication_month(p.get("publicationDate")),
+            "abstract": clean_text(p.get("abstract")),
+            "link": p.get("url", "#"),
+            "source": "Semantic Scholar",
+            "doi": external_ids.get("DOI"),
+            "arxiv_id": parse_arxiv_id(external_ids.get("ArXiv")),
+            "paper_id": p.get("paperId"),
+            "citation_count": p.get("citationCount")
+        })
+
+    return papers
+
+
+def fetch_semantic_scholar_bulk(query, start_year, token=None):
+    """
+    Fetches one page of the Semantic Scholar bulk search, which pages with
+    a continuation token instead of an offset and has no 1000-result cap.
+
+    Returns:
+        tuple: (papers, next token). papers is None if the request failed;
+               the token is None once results are exhausted.
+    """
+    params = {
+        "query": query,
+        "year": f"{start_year}-",
+        "fields": SEMANTIC_SCHOLAR_FIELDS
+    }
 
-        params = {
-            "query": query,
-            "limit": batch_size,
-            "offset": offset,
-            "fields": "title,authors,year,abstract,url"
-        }
+    if token:
+        params["token"] = token
 
+    with tracing.span("semantic_scholar.bulk_page") as page_span:
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = http_client.get(
+                SEMANTIC_SCHOLAR_BULK_URL,
+                upstream="semantic_scholar",
+                headers=HEADERS,
+                params=params,
+                timeout=30
+            )
+
+            page_span.set("status", response.status_code)
 
             if response.status_code != 200:
-                break
+                return None, None
 
-            data = response.json().get("data", [])
-            if not data:
-                break
+            body = response.json()
 
-            for p in data:
+        except Exception as e:
+            page_span.set("error", repr(e))
+            return None, None
 
-                title = p.get("title")
-                year = p.get("year")
+    return parse_semantic_scholar(body.get("data") or []), body.get("token")
 
-                if not title or not year:
-                    continue
 
-                if title in seen_titles:
-                    continue
+# -------------------- arXiv -------------------- #
 
-                if not (start_year <= year <= current_year):
-                    continue
+def fetch_arxiv(query, max_results, start=0):
+    """
+    Fetches arXiv search results for a query.
 
-                seen_titles.add(title)
+    Returns:
+        list of dict: Parsed papers, or None if the request failed.
+    """
+    params = {
+        "search_query": f"all:{query}",
+        "start": start,
+        "max_results": max_results
+    }
 
-                papers.append({
-                    "title": title,
-                    "authors": ", ".join(
-                        [a["name"] for a in p.get("authors", [])[:3]]
-                    ),
-                    "year": year,
-                    "abstract": clean_text(p.get("abstract")),
-                    "link": p.get("url", "#"),
-                    "source": "Semantic Scholar"
-                })
+    try:
+        with tracing.span("arxiv.query", start=start, max_results=max_results) as query_span:
+            response = http_client.get(ARXIV_URL, upstream="arxiv", params=params, timeout=15)
+            query_span.set("status", response.status_code)
 
-                if len(papers) >= limit:
-                    break
+        if response.status_code != 200:
+            return None
 
-            offset += batch_size
+        feed = feedparser.parse(response.content)
 
-        except Exception:
-            break
+        papers = []
 
-    # -------------------- arXiv Fallback -------------------- #
-    if len(papers) < limit:
+        for entry in feed.entries:
 
-        remaining = limit - len(papers)
+            papers.append({
+                "title": entry.title.strip(),
+                "authors": ", ".join(
+                    [a.name for a in entry.authors[:3]]
+                ),
+                "year": int(entry.published[:4]),
+                "month": publication_month(entry.published),
+                "abstract": clean_text(getattr(entry, "summary", "")),
+                "link": entry.link,
+                "source": "arXiv",
+                "doi": entry.get("arxiv_doi"),
+                "arxiv_id": parse_arxiv_id(entry.get("id"))
+            })
 
-        try:
-            search_query = f"search_query=all:{query.replace(' ', '+')}&start=0&max_results={remaining*3}"
-            feed_url = f"http://export.arxiv.org/api/query?{search_query}"
+        return papers
 
-            feed = feedparser.parse(feed_url)
+    except Exception:
+        return None
 
-            for entry in feed.entries:
 
-                year = int(entry.published[:4])
-                title = entry.title.strip()
+# -------------------- Concurrent Fetch -------------------- #
 
-                if title in seen_titles:
-                    continue
+def iter_paper_batches(query, limit=25, start_year=2000):
+    """
+    Fetches papers from Semantic Scholar and arXiv concurrently, yielding
+    each batch of new deduplicated papers as soon as its page arrives.
+
+    Semantic Scholar pages and the arXiv query run in parallel, each source
+    bounded by its own worker pool. Fetching stops once `limit` papers have
+    been yielded or the consumer stops iterating.
+    """
+    # Near-duplicates across sources are merged into the copy already
+    # yielded, so consumers holding that dict see the combined metadata
+    index = DedupIndex()
+    collected = 0
+    current_year = datetime.now().year
+
+    def merge(batch):
+        accepted = []
+
+        for paper in batch:
+
+            if collected + len(accepted) >= limit:
+                break
+
+            year = paper["year"]
+
+            if not (start_year <= year <= current_year):
+                continue
+
+            if not index.add(paper):
+                tracing.add("duplicates")
+                continue
+
+            accepted.append(paper)
+
+        return accepted
+
+    batch_size = 100
+    next_offset = 0
+    s2_exhausted = False
+
+    s2_pool = ThreadPoolExecutor(max_workers=SEMANTIC_SCHOLAR_CONCURRENCY)
+    arxiv_pool = ThreadPoolExecutor(max_workers=ARXIV_CONCURRENCY)
 
-                if not (start_year <= year <= current_year):
+    pending = {}
+
+    def submit_s2_page():
+        nonlocal next_offset
+        future = s2_pool.submit(
+            tracing.propagate(fetch_semantic_scholar_page), query, next_offset, batch_size
+        )
+        pending[future] = "Semantic Scholar"
+        next_offset += batch_size
+
+    pages_needed = -(-limit // batch_size)
+    for _ in range(min(pages_needed, SEMANTIC_SCHOLAR_CONCURRENCY)):
+        submit_s2_page()
+
+    pending[arxiv_pool.submit(tracing.propagate(fetch_arxiv), query, limit * 3)] = "arXiv"
+
+    try:
+        while pending and collected < limit:
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                source = pending.pop(future)
+                batch = future.result()
+
+                if batch:
+                    accepted = merge(batch)
+                    if accepted:
+                        collected += len(accepted)
+                        yield accepted
+
+                if source != "Semantic Scholar":
                     continue
 
-                seen_titles.add(title)
+                # A failed or empty page ends Semantic Scholar paging
+                if not batch:
+                    s2_exhausted = True
 
-                abstract = clean_text(getattr(entry, "summary", ""))
+                if (
+                    not s2_exhausted
+                    and collected < limit
+                    and next_offset + batch_size <= SEMANTIC_SCHOLAR_MAX_OFFSET
+                ):
+                    submit_s2_page()
 
-                papers.append({
-                    "title": title,
-                    "authors": ", ".join(
-                        [a.name for a in entry.authors[:3]]
-                    ),
-                    "year": year,
-                    "abstract": abstract,
-                    "link": entry.link,
-                    "source": "arXiv"
-                })
+    finally:
+        s2_pool.shutdown(wait=False, cancel_futures=True)
+        arxiv_pool.shutdown(wait=False, cancel_futures=True)
 
-                if len(papers) >= limit:
-                    break
 
-        except Exception:
-            pass
+def fetch_papers_live(query, limit=25, start_year=2000):
+    """
+    Fetches papers from all sources, bypassing the query cache.
+    """
+    papers = [
+        paper
+        for batch in iter_paper_batches(query, limit=limit, start_year=start_year)
+        for paper in batch
+    ]
 
     # -------------------- Final Sort -------------------- #
     papers = sorted(papers, key=lambda x: x["year"])
 
-    return papers[:limit]
\ No newline at end of file
+    return papers[:limit]
+
+
+# -------------------- Large Corpus -------------------- #
+
+def iter_large_corpus(query, max_papers=5000, start_year=2000):
+    """
+    Pages through every source with bounded memory for whole-field corpora.
+
+    Semantic Scholar is walked with its bulk-search continuation token,
+    then arXiv fills any remainder page by page. Deduplication keeps only
+    title signatures and identifiers, not records; papers are yielded
+    batch by batch and never accumulated.
+
+    Yields:
+        list of dict: Deduplicated papers in arrival order.
+    """
+    max_papers = min(max_papers, LARGE_CORPUS_MAX_PAPERS)
+    current_year = datetime.now().year
+    index = DedupIndex(keep_records=False)
+    collected = 0
+
+    def accept(batch):
+        nonlocal collected
+        accepted = []
+
+        for paper in batch:
+            if collected >= max_papers:
+                break
+
+            if not (start_year <= paper["year"] <= current_year):
+                continue
+
+            if not index.add(paper):
+                tracing.add("duplicates")
+                continue
+
+            accepted.append(paper)
+            collected += 1
+
+        return accepted
+
+    token = None
+
+    while collected < max_papers:
+        batch, token = fetch_semantic_scholar_bulk(query, start_year, token)
+
+        accepted = accept(batch or [])
+        if accepted:
+            yield accepted
+
+        if not batch or not token:
+            break
+
+    start = 0
+
+    while collected < max_papers:
+        batch = fetch_arxiv(query, ARXIV_PAGE_SIZE, start=start)
+
+        accepted = accept(batch or [])
+        if accepted:
+            yield accepted
+
+        if not batch or len(batch) < ARXIV_PAGE_SIZE:
+            break
+
+        start += ARXIV_PAGE_SIZE
+
+
+# -------------------- Cached Fetch -------------------- #
+
+def fetch_papers(query, limit=25, start_year=2000):
+    """
+    Returns papers for a query, served from the persistent query cache
+    when possible. Expired entries are returned immediately and refreshed
+    in the background; empty results are never cached.
+    """
+    key = make_key("papers", normalize_query(query), limit, start_year)
+
+    return query_cache.get_or_set(
+        key,
+        lambda: fetch_papers_live(query, limit=limit, start_year=start_year)
+    )
+
+
+def refresh_papers(query, limit=25, start_year=2000):
+    """
+    Fetches papers live and stores them in the query cache, for scheduled
+    refreshes that must not be served stale results.
+    """
+    papers = fetch_papers_live(query, limit=limit, start_year=start_year)
+
+    if papers:
+        query_cache.set(make_key("papers", normalize_query(query), limit, start_year), papers)
+
+    return papers
+
+
+def iter_papers(query, limit=25, start_year=2000, refresh=False):
+    """
+    Streaming counterpart of fetch_papers.
+
+    Args:
+        refresh (bool): Skip the cached result, fetch live and replace it.
+
+    Yields:
+        list of dict: Batches of papers. A cached result arrives as a single
+                      batch; otherwise each upstream page is yielded as it
+                      lands and the complete result is cached at the end.
+    """
+    key = make_key("papers", normalize_query(query), limit, start_year)
+
+    def compute():
+        return fetch_papers_live(query, limit=limit, start_year=start_year)
+
+    papers, fresh = (None, False) if refresh else query_cache.get(key)
+
+    if papers is not None:
+        if not fresh:
+            query_cache.revalidate(key, compute)
+        yield papers
+        return
+
+    collected = []
+
+    for batch in iter_paper_batches(query, limit=limit, start_year=start_year):
+        collected.extend(batch)
+        yield batch
+
+    if collected:
+        query_cache.set(key, sorted(collected, key=lambda x: x["year"]))
+
+
+def query_cache_stats():
+    return query_cache.stats()
\ No newline at end of file
@@ -0,0 +1,292 @@
+import os
+from collections import Counter
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from cache import CACHE_DIR, make_key, normalize_query
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+STORE_DIR = os.path.join(CACHE_DIR, "corpora")
+
+# Papers per Parquet row group; reads skip whole groups by year statistics
+ROW_GROUP_SIZE = 5000
+
+# Most papers held in memory while a closing store is re-sorted by year;
+# corpora up to this size are sorted in a single pass
+SORT_CHUNK_ROWS = 50000
+
+# What a timeline page renders; the abstract, by far the largest column,
+# is left on disk
+DISPLAY_COLUMNS = ["title", "authors", "year", "link", "source", "domains"]
+
+# source is dictionary-encoded in memory; Parquet dictionary-encodes every
+# column on disk, while year stays a plain int16 in memory so comparisons
+# and grouping run directly on the values
+SCHEMA = pa.schema([
+    ("title", pa.string()),
+    ("authors", pa.string()),
+    ("year", pa.int16()),
+    ("month", pa.int8()),
+    ("abstract", pa.string()),
+    ("link", pa.string()),
+    ("source", pa.dictionary(pa.int8(), pa.string())),
+    ("domains", pa.list_(pa.string())),
+    ("doi", pa.string()),
+    ("arxiv_id", pa.string()),
+    ("paper_id", pa.string()),
+    ("citation_count", pa.int32())
+])
+
+
+def corpus_path(query, max_papers, start_year):
+    """
+    Location of the Parquet file holding a query's large corpus.
+    """
+    key = make_key("corpus", normalize_query(query), max_papers, start_year)
+    return os.path.join(STORE_DIR, f"{key}.parquet")
+
+
+# =========================================================
+# PAPER TABLE
+# =========================================================
+
+def to_table(papers):
+    columns = {name: [p.get(name) for p in papers] for name in SCHEMA.names}
+    return pa.Table.from_pydict(columns, schema=SCHEMA)
+
+
+class PaperTable:
+    """
+    Compact, column-oriented collection of papers backed by an Arrow table.
+
+    Behaves like a read-only list of paper dicts for existing callers:
+    len(), iteration and integer indexing yield dicts, while slicing and
+    the year operations return new PaperTables that share the underlying
+    buffers.
+    """
+
+    def __init__(self, table=None):
+        self.table = table if table is not None else SCHEMA.empty_table()
+
+    @classmethod
+    def from_papers(cls, papers):
+        return cls(to_table(list(papers)))
+
+    @classmethod
+    def read_parquet(cls, path, years=None):
+        """
+        Loads a stored corpus, optionally only the given years.
+        """
+        filters = [("year", "in", list(years))] if years is not None else None
+        return cls(pq.read_table(path, schema=SCHEMA, filters=filters))
+
+    def to_parquet(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(self.table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp_path, path)
+
+    # ---------- list-of-dict view ---------- #
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def __iter__(self):
+        for batch in self.table.to_batches():
+            yield from batch.to_pylist()
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                raise ValueError("PaperTable slices must be contiguous")
+            return PaperTable(self.table.slice(start, max(0, stop - start)))
+
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("paper index out of range")
+
+        return self.table.slice(item, 1).to_pylist()[0]
+
+    def to_pylist(self):
+        return self.table.to_pylist()
+
+    def column(self, name):
+        return self.table.column(name).to_pylist()
+
+    def with_domains(self, domains):
+        """
+        Returns a copy with the domains column replaced, one list per paper.
+        """
+        field = SCHEMA.field("domains")
+        column = pa.array(domains, field.type)
+        return PaperTable(self.table.set_column(SCHEMA.get_field_index("domains"), field, column))
+
+    # ---------- vectorized year operations ---------- #
+
+    def year_counts(self):
+        """
+        Returns:
+            dict: {year: count}, most recent year first.
+        """
+        counts = pc.value_counts(self.table.column("year").drop_null()).to_pylist()
+        return dict(sorted(((c["values"], c["counts"]) for c in counts), reverse=True))
+
+    def filter_years(self, start=None, end=None):
+        year = self.table.column("year")
+        mask = pc.is_valid(year)
+
+        if start is not None:
+            mask = pc.and_(mask, pc.greater_equal(year, start))
+        if end is not None:
+            mask = pc.and_(mask, pc.less_equal(year, end))
+
+        return PaperTable(self.table.filter(mask))
+
+    def sort_by_year(self, descending=False):
+        order = "descending" if descending else "ascending"
+        return PaperTable(self.table.sort_by([("year", order)]))
+
+    def group_by_year(self):
+        """
+        Splits papers into per-year tables with one stable sort; each
+        group is a zero-copy slice of the sorted table.
+
+        Returns:
+            dict: {year: PaperTable}, most recent year first.
+        """
+        dated = self.filter_years().sort_by_year(descending=True)
+        groups = {}
+        offset = 0
+
+        # year_counts is ordered most recent year first, like the table,
+        # so each count is the length of the next run
+        for year, count in dated.year_counts().items():
+            groups[year] = PaperTable(dated.table.slice(offset, count))
+            offset += count
+
+        return groups
+
+
+# =========================================================
+# WRITING
+# =========================================================
+
+class PaperStoreWriter:
+    """
+    Appends paper batches to a Parquet file as they arrive so a corpus
+    never has to be held in memory. On a clean close the file is rewritten
+    most recent year first, a bounded run of years at a time, and only
+    then appears at `path`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._tmp_path = f"{path}.tmp"
+        self._sorted_path = f"{path}.sorted"
+        self._years = Counter()
+        self._pending = []
+        self._writer = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._writer = pq.ParquetWriter(self._tmp_path, SCHEMA)
+        return self
+
+    def write(self, papers):
+        self._pending.extend(papers)
+        self._years.update(p.get("year") for p in papers)
+        self.count += len(papers)
+
+        if len(self._pending) >= ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._writer.write_table(to_table(self._pending), row_group_size=ROW_GROUP_SIZE)
+            self._pending = []
+
+    def _year_runs(self):
+        """
+        Consecutive years, most recent first, grouped so each run holds at
+        most SORT_CHUNK_ROWS papers (or a single larger year).
+        """
+        runs, run, rows = [], [], 0
+
+        for year in sorted((y for y in self._years if y is not None), reverse=True):
+            if run and rows + self._years[year] > SORT_CHUNK_ROWS:
+                runs.append(run)
+                run, rows = [], 0
+            run.append(year)
+            rows += self._years[year]
+
+        if run:
+            runs.append(run)
+        return runs
+
+    def _sort_by_year(self):
+        """
+        Rewrites the arrival-ordered file year-contiguously, so each row
+        group covers a narrow year range that readers can prune by its
+        statistics. Papers keep their arrival order within a year.
+        """
+        source = pq.ParquetFile(self._tmp_path)
+        masks = [lambda year, run=run: pc.is_in(year, pa.array(run, pa.int16())) for run in self._year_runs()]
+        if self._years[None]:
+            masks.append(pc.is_null)
+
+        with pq.ParquetWriter(self._sorted_path, SCHEMA) as writer:
+            for mask in masks:
+                table = pa.concat_tables(
+                    pa.Table.from_batches([batch]).filter(mask(batch.column("year")))
+                    for batch in source.iter_batches(batch_size=ROW_GROUP_SIZE)
+                )
+                table = table.sort_by([("year", "descending")])
+                writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+
+        os.remove(self._tmp_path)
+        os.replace(self._sorted_path, self.path)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._flush()
+        finally:
+            self._writer.close()
+
+        if exc_type is not None:
+            os.remove(self._tmp_path)
+            return
+
+        try:
+            self._sort_by_year()
+        except BaseException:
+            for path in (self._tmp_path, self._sorted_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+
+
+# =========================================================
+# READING
+# =========================================================
+
+def read_page(path, year, offset=0, size=20, columns=DISPLAY_COLUMNS):
+    """
+    Returns one page of papers from a given year. Stores are sorted by
+    year when written, so only the row groups whose year statistics can
+    contain it are read, and of those only the given columns.
+
+    Returns:
+        PaperTable: Papers in arrival order within the year.
+    """
+    table = pq.read_table(path, columns=list(columns), filters=[("year", "=", year)])
+    return PaperTable(table.slice(offset, size))
@@ -0,0 +1,147 @@
+import os
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor, TimeoutError
+
+import llm_client
+import rate_limit
+from summarizer import predict_contribution
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+PREFETCH_WORKERS = int(os.getenv("AURA_PREFETCH_WORKERS", 2))
+
+# Most speculative predictions made for one query
+PREFETCH_BUDGET = int(os.getenv("AURA_PREFETCH_BUDGET", 30))
+
+
+# =========================================================
+# PREFETCH JOBS
+# =========================================================
+
+class PrefetchJob:
+    """
+    Speculative contribution predictions for one query's papers.
+
+    Predictions land in the shared LLM response cache, so a later click
+    on any session is a cache hit. Cancelling drops every prediction that
+    has not started yet.
+    """
+
+    def __init__(self, pool, budget):
+        self.budget = budget
+        self._pool = pool
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._futures = {}
+        self._counters = {"submitted": 0, "completed": 0, "skipped": 0}
+
+    def queue(self, papers):
+        """
+        Submits papers in order until the budget is spent.
+        """
+        for paper in papers:
+            title = paper["title"]
+
+            with self._lock:
+                if self._counters["submitted"] >= self.budget or self.cancelled:
+                    return
+                if title in self._futures:
+                    continue
+
+                self._futures[title] = self._pool.submit(self._run, title, paper.get("domains"))
+                self._counters["submitted"] += 1
+
+    def _run(self, title, domains):
+        if self._cancelled.is_set():
+            with self._lock:
+                self._counters["skipped"] += 1
+            return None
+
+        # Nobody is waiting on it, so it may queue behind clicks for long
+        with rate_limit.priority(rate_limit.PREFETCH), \
+                llm_client.budget(queue_timeout=llm_client.BULK_QUEUE_TIMEOUT):
+            insight = predict_contribution(title, domains)
+
+        with self._lock:
+            self._counters["completed"] += 1
+
+        return insight
+
+    def cancel(self):
+        self._cancelled.set()
+
+        with self._lock:
+            futures = list(self._futures.values())
+
+        for future in futures:
+            future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def result(self, title, timeout=None):
+        """
+        Takes over a prediction for an interactive request.
+
+        An in-flight prediction is awaited rather than repeated; a queued
+        one is withdrawn so the caller can run it at interactive priority.
+        A prediction that fell back to the canned paragraph is not handed
+        over either, so the click gets its own LLM attempt.
+
+        Returns:
+            dict or None: The prediction, or None if the caller should
+                          compute it itself.
+        """
+        with self._lock:
+            future = self._futures.get(title)
+
+        if future is None or future.cancel():
+            return None
+
+        try:
+            insight = future.result(timeout)
+        except (CancelledError, TimeoutError):
+            return None
+
+        return insight if insight and insight.get("source") != "fallback" else None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["pending"] = sum(not f.done() for f in self._futures.values())
+        stats["cancelled"] = self.cancelled
+        return stats
+
+
+class Prefetcher:
+    """
+    Process-wide worker pool shared by every session's prefetch jobs.
+
+    Args:
+        max_workers (int): Predictions computed concurrently across jobs.
+        budget (int): Most predictions submitted per job.
+    """
+
+    def __init__(self, max_workers=PREFETCH_WORKERS, budget=PREFETCH_BUDGET):
+        self.budget = budget
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+
+    def start(self, papers):
+        """
+        Queues predictions for papers in the given order, most wanted
+        first, up to the budget.
+
+        Args:
+            papers (iterable of dict): Papers with 'title' and optionally
+                'domains'; consumed lazily until the budget is reached.
+
+        Returns:
+            PrefetchJob: Handle for results, stats and cancellation.
+        """
+        job = PrefetchJob(self._pool, self.budget)
+        job.queue(papers)
+        return job
@@ -0,0 +1,307 @@
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import tracing
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+# Priority lanes; lower values are served first
+INTERACTIVE = 0
+BULK = 1
+PREFETCH = 2
+
+LANES = {INTERACTIVE: "interactive", BULK: "bulk", PREFETCH: "prefetch"}
+
+# Requests per second and burst size per upstream, overridable as
+# AURA_RATE_<UPSTREAM> and AURA_BURST_<UPSTREAM> (e.g. AURA_RATE_GROQ=5)
+DEFAULT_LIMITS = {
+    "semantic_scholar": (1.0, 3),
+    "arxiv": (1 / 3, 1),
+    "groq": (0.5, 8)
+}
+
+# After a 429 the rate is halved, never below this fraction of the
+# configured rate; each success then adds this fraction back
+MIN_RATE_FRACTION = 0.05
+RECOVERY_FRACTION = 0.02
+
+# Recent waits kept per lane for percentiles
+WAIT_SAMPLES = 1000
+
+_priority = contextvars.ContextVar("aura_lit_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(lane):
+    """
+    Runs the with-block's upstream requests in a priority lane. Worker
+    threads started through tracing.propagate inherit the lane.
+    """
+    token = _priority.set(lane)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+# =========================================================
+# TOKEN BUCKET
+# =========================================================
+
+class SharedBucket:
+    """
+    Token bucket in shared memory, drawn on by every worker process of a
+    batch so their combined rate and burst stay within one budget. Each
+    process still queues its own requests by lane in a RateLimiter, which
+    takes a shared token last, just before sending.
+
+    Args:
+        rate (float): Requests per second across all processes.
+        burst (int): Tokens that may accumulate across all processes.
+        context: multiprocessing context the processes are started from.
+    """
+
+    def __init__(self, rate, burst, context=None):
+        import multiprocessing
+
+        context = context or multiprocessing
+        self.rate = rate
+        self.burst = burst
+        # [tokens, last refill]; time.monotonic is system-wide, so it is
+        # comparable between processes
+        self._state = context.Array("d", [float(burst), time.monotonic()])
+
+    def take(self):
+        """
+        Takes a token if one is available.
+
+        Returns:
+            float: 0 on success, else seconds until a token is due.
+        """
+        with self._state.get_lock():
+            now = time.monotonic()
+            tokens = min(self.burst, self._state[0] + (now - self._state[1]) * self.rate)
+            self._state[1] = now
+
+            if tokens >= 1:
+                self._state[0] = tokens - 1
+                return 0.0
+
+            self._state[0] = tokens
+            return (1 - tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread calling one upstream.
+
+    Waiting requests are served strictly by lane, then arrival order, so
+    interactive clicks overtake queued bulk work. The refill rate adapts
+    to provider feedback: a 429 halves it and honours Retry-After, and
+    successful responses restore it gradually.
+
+    Args:
+        name (str): Upstream name, used in metrics.
+        rate (float): Configured requests per second; the adaptive rate
+                      never exceeds it.
+        burst (int): Tokens that may accumulate while idle.
+    """
+
+    def __init__(self, name, rate, burst=1):
+        self.name = name
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters = []
+        self._sequence = itertools.count()
+
+        self.shared = None
+
+        self._waits = {lane: deque(maxlen=WAIT_SAMPLES) for lane in LANES}
+        self._counters = {"acquired": 0, "throttled": 0, "timeouts": 0, "max_queue_depth": 0}
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, lane=None, timeout=None):
+        """
+        Blocks until a request may be sent.
+
+        Returns:
+            bool: False if timeout elapsed first.
+        """
+        lane = current_priority() if lane is None else lane
+        start = time.monotonic()
+        entry = (lane, next(self._sequence))
+
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            self._counters["max_queue_depth"] = max(self._counters["max_queue_depth"], len(self._waiters))
+
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    if self._waiters[0] == entry:
+                        shared_delay = 0.0
+                        if self._tokens >= 1 and now >= self._blocked_until:
+                            shared_delay = self.shared.take() if self.shared else 0.0
+                            if not shared_delay:
+                                self._tokens -= 1
+                                heapq.heappop(self._waiters)
+                                break
+                        delay = max((1 - self._tokens) / self.rate, self._blocked_until - now, shared_delay)
+                    else:
+                        delay = None
+
+                    if timeout is not None:
+                        remaining = start + timeout - now
+                        if remaining <= 0:
+                            self._counters["timeouts"] += 1
+                            return False
+                        delay = remaining if delay is None else min(delay, remaining)
+
+                    self._cond.wait(delay)
+            finally:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+
+                # The head may have changed; let the next waiter re-check
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            self._waits[lane].append(waited)
+            self._counters["acquired"] += 1
+
+        tracing.add("rate_limit_wait_ms", round(waited * 1000, 3))
+        return True
+
+    def feedback(self, status, retry_after=None):
+        """
+        Adapts the rate to an upstream response status.
+        """
+        with self._cond:
+            if status == 429:
+                self._counters["throttled"] += 1
+                self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+                self._tokens = min(self._tokens, 0.0)
+
+                if retry_after:
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+            elif status < 500:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_FRACTION)
+
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._counters)
+            stats["rate_per_s"] = round(self.rate, 4)
+            stats["configured_rate_per_s"] = round(self.max_rate, 4)
+            stats["queue_depth"] = len(self._waiters)
+
+            for lane, name in LANES.items():
+                waits = sorted(self._waits[lane])
+                if waits:
+                    for q in (50, 95):
+                        stats[f"{name}_wait_p{q}_ms"] = round(waits[round(q / 100 * (len(waits) - 1))] * 1000, 2)
+
+        return stats
+
+
+# =========================================================
+# REGISTRY
+# =========================================================
+
+_limiters = {}
+_shared_buckets = {}
+_limiters_lock = threading.Lock()
+
+
+def configured_limit(upstream):
+    """
+    Returns:
+        tuple: (rate, burst) for an upstream, after environment overrides.
+    """
+    rate, burst = DEFAULT_LIMITS[upstream]
+    env = upstream.upper()
+    return float(os.getenv(f"AURA_RATE_{env}", rate)), int(os.getenv(f"AURA_BURST_{env}", burst))
+
+
+def get_limiter(upstream):
+    """
+    Returns the process-wide limiter for an upstream, or None for an
+    upstream without a configured limit.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(upstream)
+
+        if limiter is None and upstream in DEFAULT_LIMITS:
+            rate, burst = configured_limit(upstream)
+            limiter = RateLimiter(upstream, rate=rate, burst=burst)
+            limiter.shared = _shared_buckets.get(upstream)
+            _limiters[upstream] = limiter
+
+        return limiter
+
+
+def shared_buckets(context=None):
+    """
+    One SharedBucket per configured upstream, to be created before worker
+    processes start and handed to each through use_shared_buckets.
+    """
+    return {upstream: SharedBucket(*configured_limit(upstream), context) for upstream in DEFAULT_LIMITS}
+
+
+def use_shared_buckets(buckets):
+    """
+    Makes this process's limiters draw on budgets shared with other
+    processes.
+    """
+    with _limiters_lock:
+        _shared_buckets.update(buckets)
+        for upstream, limiter in _limiters.items():
+            limiter.shared = _shared_buckets.get(upstream)
+
+
+def acquire(upstream, lane=None, timeout=None):
+    limiter = get_limiter(upstream)
+    return limiter.acquire(lane, timeout) if limiter else True
+
+
+def feedback(upstream, status, retry_after=None):
+    limiter = get_limiter(upstream)
+    if limiter:
+        limiter.feedback(status, retry_after)
+
+
+def stats():
+    """
+    Returns:
+        dict: Limiter metrics per upstream that has been used.
+    """
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
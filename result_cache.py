@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+# =========================================================
+# SHARED RESULT CACHE
+# =========================================================
+
+class _Abandoned(Exception):
+    """
+    Tells waiters their leader stopped without a result or an error.
+    """
+
+
+class SharedResultCache:
+    """
+    Process-wide, in-memory LRU of computed results with in-flight
+    request coalescing.
+
+    When several callers ask for the same key at once, only the first
+    runs compute(); the others wait for and share its result.
+
+    Args:
+        max_entries (int): Results kept before least recently used ones
+                           are dropped.
+        ttl (float): Seconds a result stays valid.
+    """
+
+    def __init__(self, max_entries=64, ttl=1800):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached result for key, or computes it once for all
+        concurrent callers. Exceptions propagate to every waiter and
+        nothing is cached. A computation interrupted by anything else
+        (e.g. Streamlit stopping the leader's script run) is re-raised in
+        the leader only, and one of the waiters takes it over.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+
+                if entry is not None and time.time() - entry[1] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return entry[0]
+
+                future = self._inflight.get(key)
+
+                if future is not None:
+                    self._counters["coalesced"] += 1
+                    leader = False
+                else:
+                    future = Future()
+                    self._inflight[key] = future
+                    self._counters["misses"] += 1
+                    leader = True
+
+            if not leader:
+                try:
+                    return future.result()
+                except _Abandoned:
+                    continue
+
+            try:
+                value = compute()
+            except Exception as e:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                future.set_exception(e)
+                raise
+            except BaseException:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                future.set_exception(_Abandoned())
+                raise
+
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._entries[key] = (value, time.time())
+                self._entries.move_to_end(key)
+
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+
+            future.set_result(value)
+            return value
+
+    def invalidate(self, key=None):
+        """
+        Drops one key, or every entry when key is None.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["inflight"] = len(self._inflight)
+        return stats
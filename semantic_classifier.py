@@ -0,0 +1,219 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from cache import CACHE_DIR, make_key
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+MODEL_NAME = os.getenv("AURA_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+BATCH_SIZE = 64
+
+# Minimum cosine similarity for a domain label to be kept
+MIN_SIMILARITY = 0.2
+TOP_K = 2
+
+ABSTRACT_CHARS = 1000
+
+
+# =========================================================
+# LAZY MODEL
+# =========================================================
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """
+    Loads the sentence-transformers model on first use, on CPU.
+    """
+    global _model
+
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(MODEL_NAME, device="cpu")
+
+    return _model
+
+
+# =========================================================
+# EMBEDDING CACHE
+# =========================================================
+
+class EmbeddingCache:
+    """
+    SQLite store of float32 embeddings keyed by model and text hash.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys):
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+
+        return found
+
+    def set_many(self, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vec, dtype=np.float32).tobytes()) for key, vec in items]
+            )
+            self._conn.commit()
+
+
+embedding_cache = EmbeddingCache(os.path.join(CACHE_DIR, "embeddings.sqlite"))
+
+
+def paper_text(paper):
+    title = paper.get("title") or ""
+    abstract = (paper.get("abstract") or "")[:ABSTRACT_CHARS]
+    return f"{title}. {abstract}" if abstract else title
+
+
+def embed_texts(texts):
+    """
+    Embeds texts in batches, reusing cached vectors.
+
+    Returns:
+        np.ndarray: (len(texts), dim) L2-normalized float32 matrix.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    keys = [make_key(MODEL_NAME, t) for t in texts]
+    cached = embedding_cache.get_many(list(set(keys)))
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached:
+            missing.setdefault(key, text)
+
+    if missing:
+        vectors = get_model().encode(
+            list(missing.values()),
+            batch_size=BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+
+        new = list(zip(missing.keys(), vectors))
+        embedding_cache.set_many(new)
+        cached.update(new)
+
+    return np.vstack([cached[key] for key in keys])
+
+
+def embed_papers(papers):
+    return embed_texts([paper_text(p) for p in papers])
+
+
+# =========================================================
+# DOMAIN CENTROIDS
+# =========================================================
+
+_centroids = (None, None)
+
+
+def domain_descriptions(taxonomy):
+    """
+    Describes each domain by its name, subdomains and keywords.
+    """
+    subdomains = {}
+    keywords = {}
+
+    for keyword, tags in taxonomy.index.items():
+        for tag in tags:
+            if tag[0] == "domain":
+                keywords.setdefault(tag[1], []).append(keyword)
+            elif tag[0] == "subdomain":
+                subdomains.setdefault(tag[1], set()).add(tag[2])
+                keywords.setdefault(tag[1], []).append(keyword)
+
+    return {
+        domain: f"{domain}: {', '.join(sorted(subdomains.get(domain, ())))}. "
+                f"{', '.join(sorted(set(keywords.get(domain, []))))}"
+        for domain in sorted(taxonomy.domain_order, key=taxonomy.domain_order.get)
+    }
+
+
+def domain_centroids(taxonomy):
+    """
+    Returns (domain names, (n_domains, dim) matrix), computed once per
+    compiled taxonomy.
+    """
+    global _centroids
+
+    cached_taxonomy, cached = _centroids
+    if cached_taxonomy is taxonomy:
+        return cached
+
+    descriptions = domain_descriptions(taxonomy)
+    names = list(descriptions)
+    matrix = embed_texts(list(descriptions.values()))
+
+    _centroids = (taxonomy, (names, matrix))
+
+    return names, matrix
+
+
+# =========================================================
+# CLASSIFICATION
+# =========================================================
+
+def classify_papers(papers, taxonomy, top_k=TOP_K, min_similarity=MIN_SIMILARITY):
+    """
+    Labels papers with their closest domains using one matrix multiply
+    between paper embeddings and domain centroids.
+
+    Returns:
+        list of list: Domain names per paper, best first. Papers with no
+                      domain above `min_similarity` get ["General Research"].
+    """
+    if not papers:
+        return []
+
+    names, centroids = domain_centroids(taxonomy)
+    if not names:
+        return [["General Research"] for _ in papers]
+
+    similarity = embed_papers(papers) @ centroids.T
+
+    top = np.argsort(-similarity, axis=1)[:, :top_k]
+    top_scores = np.take_along_axis(similarity, top, axis=1)
+
+    labels = []
+    for idx_row, score_row in zip(top, top_scores):
+        domains = [names[i] for i, s in zip(idx_row, score_row) if s >= min_similarity]
+        labels.append(domains or ["General Research"])
+
+    return labels
@@ -1,42 +1,48 @@
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 import re
 
+import llm_client
+import tracing
+from cache import CACHE_DIR, DiskCache, make_key
+from taxonomy import TaxonomyLoader
+
+
+# ==========================
+# GROQ
+# ==========================
+
+LLM_MODEL = "llama-3.1-8b-instant"
+LLM_TEMPERATURE = 0.4
+
+# Maximum Groq requests in flight for bulk prediction
+LLM_CONCURRENCY = 8
+
 
 # ==========================
-# GROQ CLIENT
+# LLM RESPONSE CACHE
 # ==========================
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# Responses are shared across sessions and keyed on the prompt inputs,
+# so every distinct paper is paid for in LLM latency only once.
+llm_cache = DiskCache(
+    os.path.join(CACHE_DIR, "llm.sqlite"),
+    ttl=int(os.getenv("AURA_LLM_CACHE_TTL", 30 * 24 * 3600)),
+    stale_ttl=0,
+    max_entries=int(os.getenv("AURA_LLM_CACHE_MAX_ENTRIES", 50000))
+)
 
 
 # =========================================================
 # DOMAIN & SUBDOMAIN KNOWLEDGE BASE
 # =========================================================
 
-DOMAIN_MAP = {
-    "Artificial Intelligence": {
-        "keywords": ["ai", "neural", "learning", "deep", "transformer", "ml", "intelligent"],
-        "subdomains": {
-            "Machine Learning": ["classification", "regression", "supervised", "unsupervised"],
-            "Deep Learning": ["cnn", "rnn", "lstm", "gan", "transformer"],
-            "Computer Vision": ["image", "vision", "object detection", "segmentation"],
-            "Natural Language Processing": ["language", "text", "bert", "llm", "chatbot"],
-            "Reinforcement Learning": ["reinforcement", "policy", "reward", "agent"]
-        }
-    },
-
-    "Cybersecurity": {
-        "keywords": ["attack", "security", "malware", "intrusion", "threat", "honeypot", "cyber"],
-        "subdomains": {
-            "Network Security": ["firewall", "ids", "ips", "network intrusion"],
-            "Cryptography": ["encryption", "cipher", "rsa", "aes"],
-            "Malware Analysis": ["trojan", "ransomware", "exploit"],
-            "Digital Forensics": ["forensic", "investigation", "evidence"],
-            "Cyber Deception": ["honeypot", "deception", "trap"]
-        }
-    }
-}
+# Domains and subdomains live in the taxonomy file (taxonomy.json by
+# default, see taxonomy.TAXONOMY_PATH) and are hot-reloaded on change.
+
+# "keyword" matches taxonomy keywords in titles; "semantic" compares
+# title + abstract embeddings against domain centroids
+DOMAIN_MODE = os.getenv("AURA_DOMAIN_MODE", "keyword")
 
 
 ACADEMIC_KEYWORDS = [
@@ -50,6 +56,26 @@ ACADEMIC_KEYWORDS = [
 ]
 
 
+RESEARCH_TYPE_RULES = [
+    ("Survey / Review Paper", ["survey", "review"]),
+    ("Proposed Framework / Model", ["framework", "model"]),
+    ("Dataset Contribution", ["dataset"]),
+    ("Comparative Study", ["evaluation", "comparative"]),
+    ("System Architecture Design", ["architecture", "system"])
+]
+
+DEFAULT_RESEARCH_TYPE = "Experimental Research"
+
+
+NOVELTY_RULES = [
+    ("High Innovation", ["novel", "innovative", "first"]),
+    ("Moderate to High Innovation", ["adaptive", "hybrid", "robust"]),
+    ("Knowledge Consolidation", ["survey", "review"])
+]
+
+DEFAULT_NOVELTY = "Moderate Innovation"
+
+
 # =========================================================
 # TEXT CLEANING
 # =========================================================
@@ -59,81 +85,155 @@ def clean_text(text):
     return text.lower()
 
 
+# =========================================================
+# KEYWORD MATCHER
+# =========================================================
+
+def matcher_keywords():
+    """
+    Tags the non-taxonomy keywords that scoring rules look for.
+    """
+    extra = {k: [("academic",)] for k in ACADEMIC_KEYWORDS}
+
+    for _, keys in RESEARCH_TYPE_RULES + NOVELTY_RULES:
+        for k in keys:
+            extra.setdefault(k, [])
+
+    return extra
+
+
+taxonomy_loader = TaxonomyLoader(extra_keywords=matcher_keywords())
+
+
+def match_keywords(title):
+    """
+    Returns the set of distinct keywords found in a title in one scan.
+    """
+    return taxonomy_loader.get().match(title)
+
+
+def extract_features(title, domains=None):
+    """
+    Derives every keyword-based feature of a title from a single scan.
+
+    Args:
+        title (str): Paper title.
+        domains (list): Precomputed domain labels, e.g. from
+                        classify_domains. Inferred from keywords if omitted.
+
+    Returns:
+        dict: domains, subdomains, research_type, novelty and confidence.
+    """
+    matched = match_keywords(title)
+
+    domains, subdomains = domains_from_matches(matched, domains)
+
+    return {
+        "domains": domains,
+        "subdomains": subdomains,
+        "research_type": research_type_from_matches(matched),
+        "novelty": novelty_from_matches(matched),
+        "confidence": confidence_from_matches(matched, title)
+    }
+
+
 # =========================================================
 # DOMAIN INFERENCE
 # =========================================================
 
-def infer_domains(title):
-    t = clean_text(title)
+def domains_from_matches(matched, domains=None):
+    taxonomy = taxonomy_loader.get()
 
     domain_scores = {}
-    subdomains_detected = []
-
-    for domain, data in DOMAIN_MAP.items():
-        score = sum(1 for k in data["keywords"] if k in t)
+    candidate_subdomains = {}
 
-        if score > 0:
-            domain_scores[domain] = score
+    for k in matched:
+        for entry in taxonomy.index.get(k, []):
+            if entry[0] == "domain":
+                domain_scores[entry[1]] = domain_scores.get(entry[1], 0) + 1
+            elif entry[0] == "subdomain":
+                candidate_subdomains.setdefault(entry[1], set()).add(entry[2])
 
-            for sub, sub_keys in data["subdomains"].items():
-                if any(sk in t for sk in sub_keys):
-                    subdomains_detected.append(sub)
+    if domains:
+        sorted_domains = list(domains)
 
-    if not domain_scores:
+    elif not domain_scores:
         return ["General Research"], []
 
-    sorted_domains = sorted(domain_scores, key=domain_scores.get, reverse=True)
+    else:
+        sorted_domains = sorted(
+            domain_scores,
+            key=lambda d: (-domain_scores[d], taxonomy.domain_order[d])
+        )
+
+    subdomains = {
+        sub
+        for domain in sorted_domains
+        for sub in candidate_subdomains.get(domain, ())
+    }
 
-    return sorted_domains, list(set(subdomains_detected))
+    return sorted_domains, sorted(subdomains, key=taxonomy.subdomain_order.get)
+
+
+def infer_domains(title):
+    return domains_from_matches(match_keywords(title))
+
+
+def classify_domains(papers):
+    """
+    Labels a batch of papers with domains according to DOMAIN_MODE.
+
+    Returns:
+        list of list: Domain names per paper, best first.
+    """
+    if DOMAIN_MODE == "semantic":
+        import semantic_classifier
+        return semantic_classifier.classify_papers(papers, taxonomy_loader.get())
+
+    return [infer_domains(p["title"])[0] for p in papers]
 
 
 # =========================================================
 # RESEARCH TYPE
 # =========================================================
 
-def infer_research_type(title):
-    t = title.lower()
+def research_type_from_matches(matched):
+    for research_type, keys in RESEARCH_TYPE_RULES:
+        if any(k in matched for k in keys):
+            return research_type
+    return DEFAULT_RESEARCH_TYPE
+
 
-    if "survey" in t or "review" in t:
-        return "Survey / Review Paper"
-    if "framework" in t or "model" in t:
-        return "Proposed Framework / Model"
-    if "dataset" in t:
-        return "Dataset Contribution"
-    if "evaluation" in t or "comparative" in t:
-        return "Comparative Study"
-    if "architecture" in t or "system" in t:
-        return "System Architecture Design"
-    return "Experimental Research"
+def infer_research_type(title):
+    return research_type_from_matches(match_keywords(title))
 
 
 # =========================================================
 # NOVELTY
 # =========================================================
 
-def novelty_estimation(title):
-    t = title.lower()
+def novelty_from_matches(matched):
+    for novelty, keys in NOVELTY_RULES:
+        if any(k in matched for k in keys):
+            return novelty
+    return DEFAULT_NOVELTY
 
-    if "novel" in t or "innovative" in t or "first" in t:
-        return "High Innovation"
-    if "adaptive" in t or "hybrid" in t or "robust" in t:
-        return "Moderate to High Innovation"
-    if "survey" in t or "review" in t:
-        return "Knowledge Consolidation"
-    return "Moderate Innovation"
+
+def novelty_estimation(title):
+    return novelty_from_matches(match_keywords(title))
 
 
 # =========================================================
 # CONFIDENCE
 # =========================================================
 
-def confidence_score(title):
-    score = 0
-    t = title.lower()
+def confidence_from_matches(matched, title):
+    index = taxonomy_loader.get().index
 
-    for word in ACADEMIC_KEYWORDS:
-        if word in t:
-            score += 1
+    score = sum(
+        1 for k in matched
+        if ("academic",) in index.get(k, [])
+    )
 
     length_factor = len(title.split()) // 3
     score += length_factor
@@ -144,11 +244,15 @@ def confidence_score(title):
     return min(98, max(65, final_score))
 
 
+def confidence_score(title):
+    return confidence_from_matches(match_keywords(title), title)
+
+
 # =========================================================
 # GROQ REFINEMENT (REPLACED OLLAMA)
 # =========================================================
 
-def llm_refinement(title, domains, subdomains, research_type):
+def llm_refinement(title, domains, subdomains, research_type, on_token=None):
 
     prompt = f"""
 You are a senior academic research analyst.
@@ -175,17 +279,29 @@ Write ONE professional academic paragraph explaining:
 - impact
 """
 
-    try:
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.4
-        )
+    key = make_key(
+        "llm_refinement",
+        title,
+        list(domains),
+        sorted(subdomains),
+        research_type,
+        LLM_MODEL,
+        LLM_TEMPERATURE
+    )
+
+    with tracing.span("llm.refinement", model=LLM_MODEL):
+        return llm_cache.get_or_set(key, lambda: request_refinement(prompt, on_token))
+
 
-        return response.choices[0].message.content.strip()
+def request_refinement(prompt, on_token=None):
+    """
+    Streams a completion within the LLM latency SLO.
 
-    except Exception:
-        return None
+    Returns:
+        str or None: None on failure or a missed deadline, so callers
+                     fall back and nothing partial is cached.
+    """
+    return llm_client.complete(prompt, LLM_MODEL, LLM_TEMPERATURE, on_token=on_token)
 
 
 # =========================================================
@@ -206,18 +322,31 @@ def fallback_paragraph(title, domains, research_type):
 # MAIN
 # =========================================================
 
-def predict_contribution(title):
+def predict_contribution(title, domains=None, on_token=None):
+    """
+    Args:
+        on_token (callable): Receives the paragraph text so far while the
+            LLM streams it; not called on a cache hit.
 
-    domains, subdomains = infer_domains(title)
-    research_type = infer_research_type(title)
+    Returns:
+        dict: The prediction; 'source' is "llm", or "fallback" when the
+              paragraph is the canned text because the LLM call failed.
+    """
+    features = extract_features(title, domains)
 
-    paragraph = llm_refinement(title, domains, subdomains, research_type)
+    domains = features["domains"]
+    subdomains = features["subdomains"]
+    research_type = features["research_type"]
+
+    paragraph = llm_refinement(title, domains, subdomains, research_type, on_token)
+    source = "llm"
 
     if not paragraph:
         paragraph = fallback_paragraph(title, domains, research_type)
+        source = "fallback"
 
-    confidence = confidence_score(title)
-    novelty = novelty_estimation(title)
+    confidence = features["confidence"]
+    novelty = features["novelty"]
 
     impact = (
         "This research may influence future investigations, inspire "
@@ -231,5 +360,215 @@ def predict_contribution(title):
         "impact": impact,
         "domains": domains,
         "subdomains": subdomains,
-        "research_type": research_type
+        "research_type": research_type,
+        "source": source
     }
+
+
+
+# =========================================================
+# BULK PREDICTION
+# =========================================================
+
+def iter_predict_contributions(titles, max_workers=LLM_CONCURRENCY, domains=None):
+    """
+    Predicts contributions for many titles concurrently.
+
+    Args:
+        titles (list of str): Paper titles.
+        max_workers (int): Maximum LLM requests in flight.
+        domains (list of list): Optional domain labels, parallel to titles.
+
+    Yields:
+        tuple: (index, result) for each title, in completion order, so
+               callers can surface results as soon as they are ready.
+    """
+    if not titles:
+        return
+
+    domains = domains or [None] * len(titles)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(tracing.propagate(predict_contribution), title, domains[idx]): idx
+            for idx, title in enumerate(titles)
+        }
+
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def predict_contributions(titles, max_workers=LLM_CONCURRENCY, domains=None):
+    """
+    Predicts contributions for many titles concurrently.
+
+    Returns:
+        list of dict: Results in the same order as `titles`.
+    """
+    results = [None] * len(titles)
+
+    for idx, result in iter_predict_contributions(titles, max_workers, domains):
+        results[idx] = result
+
+    return results
+
+
+def precompute_contributions(titles, max_workers=LLM_CONCURRENCY, domains=None):
+    """
+    Warms the LLM response cache for titles ahead of user requests.
+
+    Returns:
+        int: Number of titles processed.
+    """
+    return sum(1 for _ in iter_predict_contributions(titles, max_workers, domains))
+
+
+def llm_cache_stats():
+    return llm_cache.stats()
+
+
+def llm_call_stats():
+    return llm_client.stats()
+
+# =========================================================
+# ABSTRACT SUMMARIZATION
+# =========================================================
+
+SUMMARY_SENTENCES = 2
+SUMMARY_KEY_TERMS = 5
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9])")
+
+# Sentences that state what the paper builds or finds carry the summary
+_CONTRIBUTION_CUES = re.compile(
+    r"\b(we (propose|present|introduce|develop|design|show|demonstrate|find)|"
+    r"this (paper|work|study|article)|our (approach|method|system|results)|results (show|indicate))\b",
+    re.IGNORECASE
+)
+CONTRIBUTION_CUE_BONUS = 0.15
+
+
+def split_sentences(text):
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text or "") if len(s.strip()) > 20]
+
+
+def summarize_papers(papers, sentences=SUMMARY_SENTENCES, escalate_top=0):
+    """
+    Extractive summaries for a whole result set at once.
+
+    Every abstract sentence goes into one TF-IDF matrix. A sentence is
+    scored by its cosine similarity to its own paper's centroid, with a
+    bonus for contribution statements, and the best ones per paper are
+    kept in their original order. No network call is made unless
+    escalate_top asks for LLM summaries of the most representative papers.
+
+    Args:
+        papers (list of dict): Papers with 'title' and 'abstract'.
+        sentences (int): Sentences kept per paper.
+        escalate_top (int): Papers, ranked by similarity to the result
+                            set as a whole, summarized by the LLM instead.
+
+    Returns:
+        list of dict: Per paper, in input order: 'title', 'summary',
+                      'key_terms' and 'method' ("extractive", "llm" or
+                      "title" when there is no abstract).
+    """
+    import numpy as np
+    from scipy import sparse
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import normalize
+
+    papers = list(papers)
+    results = [
+        {"title": p["title"], "summary": p["title"], "key_terms": [], "method": "title"}
+        for p in papers
+    ]
+
+    split = [split_sentences(p.get("abstract")) for p in papers]
+    all_sentences = [s for paper_sentences in split for s in paper_sentences]
+
+    if not all_sentences:
+        return results
+
+    owner = np.repeat(np.arange(len(papers)), [len(s) for s in split])
+    position = np.concatenate([np.arange(len(s)) for s in split if s])
+
+    with tracing.span("summarize.tfidf", papers=len(papers), sentences=len(all_sentences)):
+        vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True)
+
+        try:
+            matrix = vectorizer.fit_transform(all_sentences)
+        except ValueError:
+            # Every sentence was stop words only
+            return results
+
+        # papers x sentences membership, so all centroids are one product
+        membership = sparse.csr_matrix(
+            (np.ones(len(owner)), (owner, np.arange(len(owner)))),
+            shape=(len(papers), len(owner))
+        )
+        centroids = normalize(membership @ matrix)
+
+        scores = np.asarray(matrix.multiply(centroids[owner]).sum(axis=1)).ravel()
+        scores += CONTRIBUTION_CUE_BONUS * np.fromiter(
+            (bool(_CONTRIBUTION_CUES.search(s)) for s in all_sentences), dtype=float, count=len(all_sentences)
+        )
+
+        # Rank sentences within each paper, keep the top ones, then
+        # restore reading order
+        order = np.lexsort((-scores, owner))
+        group_start = np.searchsorted(owner[order], owner[order], side="left")
+        keep = order[np.arange(len(order)) - group_start < sentences]
+        keep = keep[np.lexsort((position[keep], owner[keep]))]
+
+    terms = vectorizer.get_feature_names_out()
+
+    for idx in np.unique(owner):
+        row = centroids.getrow(idx)
+        top = row.indices[np.argsort(-row.data)[:SUMMARY_KEY_TERMS]]
+        results[idx]["key_terms"] = [terms[t] for t in top]
+
+    chosen = {}
+    for s in keep:
+        chosen.setdefault(owner[s], []).append(all_sentences[s])
+
+    for idx, picked in chosen.items():
+        results[idx]["summary"] = " ".join(picked)
+        results[idx]["method"] = "extractive"
+
+    if escalate_top:
+        corpus = normalize(np.asarray(centroids.sum(axis=0)))
+        representativeness = np.asarray(centroids @ corpus.T).ravel()
+        top = [i for i in np.argsort(-representativeness)[:escalate_top] if split[i]]
+
+        with ThreadPoolExecutor(max_workers=LLM_CONCURRENCY) as pool:
+            futures = {
+                pool.submit(tracing.propagate(llm_summary), papers[i]["title"], papers[i]["abstract"]): i
+                for i in top
+            }
+
+            for future in as_completed(futures):
+                summary = future.result()
+                if summary:
+                    results[futures[future]]["summary"] = summary
+                    results[futures[future]]["method"] = "llm"
+
+    return results
+
+
+def llm_summary(title, abstract):
+    prompt = f"""
+Summarize the system or approach described in this abstract in at most
+three sentences: what it does, how, and how it was evaluated.
+
+Title:
+{title}
+
+Abstract:
+{abstract}
+"""
+
+    key = make_key("llm_summary", title, abstract, LLM_MODEL, LLM_TEMPERATURE)
+
+    with tracing.span("llm.summary", model=LLM_MODEL):
+        return llm_cache.get_or_set(key, lambda: request_refinement(prompt))
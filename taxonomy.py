@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from cache import CACHE_DIR
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+TAXONOMY_PATH = os.getenv(
+    "AURA_TAXONOMY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy.json")
+)
+
+# Seconds between checks of the taxonomy file for changes
+RELOAD_INTERVAL = float(os.getenv("AURA_TAXONOMY_RELOAD_INTERVAL", 5))
+
+# Bump when the compiled index layout changes
+INDEX_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def normalize_keyword(keyword):
+    return " ".join(tokenize(keyword))
+
+
+# =========================================================
+# COMPILED TAXONOMY
+# =========================================================
+
+class Taxonomy:
+    """
+    A domain taxonomy compiled into an inverted keyword index.
+
+    Titles are matched by looking up each word n-gram in the index, so
+    classification cost depends on title length, not taxonomy size.
+
+    Args:
+        index (dict): keyword -> list of tags. Tags are ("domain", domain),
+                      ("subdomain", domain, subdomain) or caller-defined.
+        domain_order (dict): domain -> position in the taxonomy file.
+        subdomain_order (dict): subdomain -> position in the taxonomy file.
+    """
+
+    def __init__(self, index, domain_order, subdomain_order):
+        self.index = index
+        self.domain_order = domain_order
+        self.subdomain_order = subdomain_order
+        self.max_ngram = max((len(k.split()) for k in index), default=1)
+
+    @classmethod
+    def compile(cls, domains, extra_keywords=None):
+        """
+        Builds the index from a domain map and optional extra tagged
+        keywords ({keyword: [tag, ...]}).
+        """
+        index = {}
+
+        def tag(keyword, entry=None):
+            tags = index.setdefault(normalize_keyword(keyword), [])
+            if entry is not None and entry not in tags:
+                tags.append(entry)
+
+        for domain, data in domains.items():
+            for k in data.get("keywords", []):
+                tag(k, ("domain", domain))
+            for sub, sub_keys in data.get("subdomains", {}).items():
+                for k in sub_keys:
+                    tag(k, ("subdomain", domain, sub))
+
+        for k, entries in (extra_keywords or {}).items():
+            tag(k)
+            for entry in entries:
+                tag(k, tuple(entry))
+
+        domain_order = {domain: i for i, domain in enumerate(domains)}
+        subdomain_order = {}
+        for data in domains.values():
+            for sub in data.get("subdomains", {}):
+                subdomain_order.setdefault(sub, len(subdomain_order))
+
+        return cls(index, domain_order, subdomain_order)
+
+    def match(self, text):
+        """
+        Returns the set of distinct keywords found in text.
+
+        Every word n-gram up to the longest keyword is looked up, with
+        trailing plural "s"/"es" forms also accepted.
+        """
+        words = tokenize(text)
+        matched = set()
+
+        for i in range(len(words)):
+            for n in range(1, min(self.max_ngram, len(words) - i) + 1):
+                gram = " ".join(words[i:i + n])
+                candidates = [gram]
+
+                if gram.endswith("s"):
+                    candidates.append(gram[:-1])
+                    if gram.endswith("es"):
+                        candidates.append(gram[:-2])
+
+                for candidate in candidates:
+                    if candidate in self.index:
+                        matched.add(candidate)
+                        break
+
+        return matched
+
+    def to_json(self):
+        return {
+            "version": INDEX_VERSION,
+            "index": self.index,
+            "domain_order": self.domain_order,
+            "subdomain_order": self.subdomain_order
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        index = {k: [tuple(t) for t in tags] for k, tags in data["index"].items()}
+        return cls(index, data["domain_order"], data["subdomain_order"])
+
+
+# =========================================================
+# LOADING
+# =========================================================
+
+def parse_taxonomy(raw, path):
+    if path.endswith((".yaml", ".yml")):
+        import yaml
+        return yaml.safe_load(raw)
+
+    return json.loads(raw)
+
+
+def load_taxonomy(path=TAXONOMY_PATH, extra_keywords=None):
+    """
+    Loads and compiles a JSON or YAML taxonomy file.
+
+    The compiled index is cached on disk keyed by a hash of the file and
+    extra keywords, so restarts skip parsing and compilation.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    digest = hashlib.sha256(raw)
+    digest.update(json.dumps(extra_keywords or {}, sort_keys=True).encode("utf-8"))
+    digest.update(str(INDEX_VERSION).encode("utf-8"))
+
+    cache_path = os.path.join(CACHE_DIR, f"taxonomy-{digest.hexdigest()[:16]}.json")
+
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return Taxonomy.from_json(json.load(f))
+    except (OSError, ValueError, KeyError):
+        pass
+
+    taxonomy = Taxonomy.compile(parse_taxonomy(raw, path), extra_keywords)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(taxonomy.to_json(), f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+    return taxonomy
+
+
+class TaxonomyLoader:
+    """
+    Holds the current compiled taxonomy and hot-reloads it when the
+    file changes, without restarting the process. A file that fails to
+    load leaves the previous taxonomy in place.
+    """
+
+    def __init__(self, path=TAXONOMY_PATH, extra_keywords=None, reload_interval=RELOAD_INTERVAL):
+        self.path = path
+        self.extra_keywords = extra_keywords
+        self.reload_interval = reload_interval
+
+        self._lock = threading.Lock()
+        self._mtime = os.path.getmtime(path)
+        self._checked = time.monotonic()
+        self._taxonomy = load_taxonomy(path, extra_keywords)
+
+    def get(self):
+        now = time.monotonic()
+
+        if now - self._checked >= self.reload_interval:
+            with self._lock:
+                if now - self._checked >= self.reload_interval:
+                    self._checked = now
+                    self._reload_if_changed()
+
+        return self._taxonomy
+
+    def reload(self):
+        with self._lock:
+            self._mtime = os.path.getmtime(self.path)
+            self._taxonomy = load_taxonomy(self.path, self.extra_keywords)
+        return self._taxonomy
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+            if mtime != self._mtime:
+                self._taxonomy = load_taxonomy(self.path, self.extra_keywords)
+                self._mtime = mtime
+        except Exception:
+            pass
@@ -1,34 +1,192 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
 from datetime import datetime
 
-def build_timeline(papers, years_back=10):
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from paper_store import PaperTable, to_table
+
+
+RESOLUTIONS = ("year", "quarter", "decade")
+
+
+def as_table(papers):
+    """
+    Columnar view of a paper batch: PaperTables and Arrow tables are used
+    as-is, lists of dicts are converted once.
+    """
+    if isinstance(papers, PaperTable):
+        return papers.table
+    if isinstance(papers, pa.Table):
+        return papers
+    return to_table(list(papers))
+
+
+def bucket_keys(table, resolution):
+    """
+    Bucket key of every row, computed column-wise.
+
+    Quarters are keyed year * 10 + quarter, with quarter 0 for papers
+    whose publication month is unknown.
+    """
+    year = table.column("year").cast(pa.int32())
+
+    if resolution == "year":
+        return year
+
+    if resolution == "decade":
+        return pc.multiply(pc.divide(year, 10), 10)
+
+    month = table.column("month").cast(pa.int32())
+    quarter = pc.coalesce(pc.add(pc.divide(pc.subtract(month, 1), 3), 1), 0)
+    return pc.add(pc.multiply(year, 10), quarter)
+
+
+def bucket_label(key, resolution):
+    if resolution == "quarter":
+        year, quarter = divmod(key, 10)
+        return f"{year} Q{quarter}" if quarter else f"{year} (undated)"
+    if resolution == "decade":
+        return f"{key}s"
+    return key
+
+
+def _count_pairs(keys, values):
+    """
+    Counts (bucket, value) pairs with one hash aggregation.
+    """
+    grouped = pa.table({"bucket": keys, "value": values}).group_by(["bucket", "value"])
+    return grouped.aggregate([([], "count_all")]).to_pylist()
+
+
+class TimelineBuilder:
+    """
+    Incrementally aggregates papers into year, quarter and decade buckets.
+
+    Each added batch is bucketed with vectorized Arrow kernels and merged
+    into running per-bucket counts, domain counts and source mix, so new
+    pages update the timeline without revisiting earlier papers.
+
+    Args:
+        years_back (int): Only keep the most recent years_back years. None
+                          (default) keeps every year up to the current one.
+        start_year (int): Earliest year kept; overrides years_back.
+        keep_papers (bool): Retain the papers themselves for timeline().
+                            Disable to aggregate corpora that live on disk.
+    """
+
+    def __init__(self, years_back=None, start_year=None, keep_papers=True):
+        self.current_year = datetime.now().year
+
+        if start_year is None and years_back is not None:
+            start_year = self.current_year - years_back
+
+        self.start_year = start_year
+        self.keep_papers = keep_papers
+        self.count = 0
+
+        self._batches = []
+        self._grouped = None
+        self._counts = {r: Counter() for r in RESOLUTIONS}
+        self._domains = {r: defaultdict(Counter) for r in RESOLUTIONS}
+        self._sources = {r: defaultdict(Counter) for r in RESOLUTIONS}
+
+    def add(self, papers):
+        """
+        Merges a batch of papers into the aggregates.
+
+        Args:
+            papers (list of dict or PaperTable): Each paper needs at least
+                'title' and 'year'; 'month', 'source' and 'domains' feed the
+                quarter, source mix and domain breakdowns.
+        """
+        table = PaperTable(as_table(papers)).filter_years(self.start_year, self.current_year).table
+
+        if not table.num_rows:
+            return
+
+        self.count += table.num_rows
+
+        if self.keep_papers:
+            self._batches.append(table)
+            self._grouped = None
+
+        sources = table.column("source").cast(pa.string())
+        domains = table.column("domains").combine_chunks()
+        domain_rows = pc.list_parent_indices(domains)
+        domain_names = pc.list_flatten(domains)
+
+        for resolution in RESOLUTIONS:
+            keys = bucket_keys(table, resolution)
+
+            for c in pc.value_counts(keys).to_pylist():
+                self._counts[resolution][c["values"]] += c["counts"]
+
+            for row in _count_pairs(keys, sources):
+                self._sources[resolution][row["bucket"]][row["value"]] += row["count_all"]
+
+            if len(domain_names):
+                domain_keys = pc.take(keys, domain_rows)
+                for row in _count_pairs(domain_keys, domain_names):
+                    self._domains[resolution][row["bucket"]][row["value"]] += row["count_all"]
+
+    def counts(self, resolution="year"):
+        """
+        Returns:
+            dict: {bucket: paper count}, most recent first.
+        """
+        counts = self._counts[resolution]
+        return {bucket_label(k, resolution): counts[k] for k in sorted(counts, reverse=True)}
+
+    def summary(self, resolution="year", top_domains=3):
+        """
+        Per-bucket statistics, most recent first.
+
+        Returns:
+            dict: {bucket: {"count", "top_domains", "sources"}}, where
+                  top_domains is a list of (domain, count) and sources
+                  maps each source to its share of the bucket.
+        """
+        summary = {}
+
+        for key in sorted(self._counts[resolution], reverse=True):
+            count = self._counts[resolution][key]
+            sources = self._sources[resolution][key]
+
+            summary[bucket_label(key, resolution)] = {
+                "count": count,
+                "top_domains": self._domains[resolution][key].most_common(top_domains),
+                "sources": {s: n / count for s, n in sources.most_common()}
+            }
+
+        return summary
+
+    def timeline(self):
+        """
+        Returns:
+            dict: Timeline dictionary with year as key and a PaperTable of
+                  that year's papers as value, sorted by year descending.
+                  Only includes years that have papers.
+        """
+        if self._grouped is None:
+            table = pa.concat_tables(self._batches) if self._batches else None
+            self._grouped = PaperTable(table).group_by_year()
+
+        return self._grouped
+
+
+def build_timeline(papers, years_back=None):
     """
     Builds a timeline of papers grouped by year.
 
     Args:
-        papers (list of dict): Each dict should have keys 'title', 'authors', 'year', 'source', 'link'.
-        years_back (int): Number of years to include in the timeline (default 10).
+        papers (list of dict or PaperTable): Each paper should have keys 'title', 'authors', 'year', 'source', 'link'.
+        years_back (int): Number of years to include in the timeline (default: all).
 
     Returns:
-        dict: Timeline dictionary with year as key and list of papers as value, sorted by year descending.
-              Only includes years that have papers.
-    """
-    timeline = defaultdict(list)
-    current_year = datetime.now().year
-    start_year = current_year - years_back
-
-    for paper in papers:
-        year = paper.get("year")
-        if year and start_year <= year <= current_year:
-            timeline[year].append({
-                "title": paper.get("title"),
-                "authors": paper.get("authors"),
-                "source": paper.get("source"),
-                "link": paper.get("link")
-            })
-
-    # Remove years with no papers
-    timeline = {year: items for year, items in timeline.items() if items}
-
-    # Return timeline sorted by year descending
-    return dict(sorted(timeline.items(), reverse=True))
+        dict: Timeline dictionary with year as key and a PaperTable of that year's papers as value,
+              sorted by year descending. Only includes years that have papers.
+    """
+    builder = TimelineBuilder(years_back)
+    builder.add(papers)
+    return builder.timeline()
@@ -0,0 +1,255 @@
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+SERVICE_NAME = "aura-lit"
+
+# When set, every finished trace is appended here as one OTLP/JSON line
+TRACE_LOG = os.getenv("AURA_TRACE_LOG")
+
+_current = contextvars.ContextVar("aura_lit_span", default=None)
+_log_lock = threading.Lock()
+
+
+# =========================================================
+# SPANS
+# =========================================================
+
+class Span:
+    """
+    One timed stage of a trace with numeric counters (upstream calls,
+    bytes, cache hits, retries, ...) and free-form attributes.
+    """
+
+    def __init__(self, trace, name, parent=None, attributes=None):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.counters = {}
+        self.start = time.time()
+        self.end = None
+        self._lock = threading.Lock()
+
+        trace._register(self)
+
+    def add(self, key, amount=1):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self):
+        if self.end is None:
+            self.end = time.time()
+
+    def to_dict(self, origin):
+        end = self.end if self.end is not None else time.time()
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round((end - self.start) * 1000, 3),
+            "attributes": dict(self.attributes),
+            "counters": dict(self.counters)
+        }
+
+
+class _NoopSpan:
+
+    def add(self, key, amount=1):
+        pass
+
+    def set(self, key, value):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def _register(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self):
+        """
+        Flat span list with start offsets relative to the root span.
+        """
+        with self._lock:
+            spans = list(self.spans)
+
+        origin = spans[0].start if spans else time.time()
+
+        return {
+            "trace_id": self.trace_id,
+            "start_time": origin,
+            "spans": [s.to_dict(origin) for s in spans]
+        }
+
+
+# =========================================================
+# CONTEXT
+# =========================================================
+
+@contextmanager
+def start_trace(name, **attributes):
+    """
+    Opens a new trace whose root span covers the with-block.
+    """
+    trace = Trace()
+    root = Span(trace, name, attributes=attributes)
+    token = _current.set(root)
+
+    try:
+        yield trace
+    finally:
+        root.finish()
+        _current.reset(token)
+
+        if TRACE_LOG:
+            export_json_log(trace.to_dict(), TRACE_LOG)
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Times a stage as a child of the current span. Does nothing outside
+    a trace.
+    """
+    parent = _current.get()
+
+    if parent is None:
+        yield NOOP_SPAN
+        return
+
+    child = Span(parent.trace, name, parent, attributes)
+    token = _current.set(child)
+
+    try:
+        yield child
+    except Exception as e:
+        child.set("error", repr(e))
+        raise
+    finally:
+        child.finish()
+        _current.reset(token)
+
+
+def add(key, amount=1):
+    """
+    Increments a counter on the current span, if any.
+    """
+    current = _current.get()
+    if current is not None:
+        current.add(key, amount)
+
+
+def propagate(fn):
+    """
+    Binds fn to the caller's trace context so spans it opens on a worker
+    thread attach to the right parent. Call once per submitted task.
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+# =========================================================
+# EXPORT
+# =========================================================
+
+def _otel_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace_dict):
+    """
+    Converts a trace dict into the OTLP/JSON ExportTraceServiceRequest
+    shape accepted by OpenTelemetry collectors.
+    """
+    origin_ns = int(trace_dict["start_time"] * 1e9)
+    spans = []
+
+    for s in trace_dict["spans"]:
+        start_ns = origin_ns + int(s["start_ms"] * 1e6)
+        attributes = {**s["attributes"], **s["counters"]}
+
+        spans.append({
+            "traceId": trace_dict["trace_id"],
+            "spanId": s["span_id"],
+            "parentSpanId": s["parent_id"] or "",
+            "name": s["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int(s["duration_ms"] * 1e6)),
+            "attributes": [
+                {"key": k, "value": _otel_value(v)} for k, v in attributes.items()
+            ],
+            "status": {"code": 2, "message": s["attributes"]["error"]} if "error" in s["attributes"] else {}
+        })
+
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]
+            },
+            "scopeSpans": [{
+                "scope": {"name": SERVICE_NAME},
+                "spans": spans
+            }]
+        }]
+    }
+
+
+def export_json_log(trace_dict, path):
+    line = json.dumps(to_otlp(trace_dict))
+    with _log_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def flame_rows(trace_dict):
+    """
+    Orders spans depth-first for a flame-style breakdown.
+
+    Returns:
+        list of tuple: (depth, span dict), children after their parent in
+                       start order.
+    """
+    children = {}
+    for s in trace_dict["spans"]:
+        children.setdefault(s["parent_id"], []).append(s)
+
+    rows = []
+
+    def walk(parent_id, depth):
+        for s in sorted(children.get(parent_id, []), key=lambda s: s["start_ms"]):
+            rows.append((depth, s))
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+    return rows
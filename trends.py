@@ -0,0 +1,340 @@
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+import tracing
+from cache import CACHE_DIR, make_key, normalize_query, paper_key
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+TRENDS_PATH = os.path.join(CACHE_DIR, "topics.sqlite")
+
+N_TOPICS = int(os.getenv("AURA_TOPICS", 8))
+
+# Hashed feature space; stateless, so new papers never force a refit
+N_FEATURES = 2 ** 15
+
+# Papers held back before the first fit, so initial centroids are not
+# drawn from a handful of titles
+MIN_FIT_PAPERS = 5 * N_TOPICS
+
+# Emerging score: mean share over the last RECENT_YEARS minus the mean
+# share before them; slope is fitted over the last SLOPE_YEARS
+RECENT_YEARS = 3
+SLOPE_YEARS = 5
+
+LABEL_TERMS = 4
+
+ABSTRACT_CHARS = 1000
+
+_WORD = re.compile(r"[a-z][a-z\-]{2,}")
+
+_STOP_WORDS = None
+
+
+def label_words(text):
+    global _STOP_WORDS
+
+    if _STOP_WORDS is None:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        _STOP_WORDS = ENGLISH_STOP_WORDS
+
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOP_WORDS]
+
+
+def paper_text(paper):
+    return f"{paper.get('title') or ''}. {(paper.get('abstract') or '')[:ABSTRACT_CHARS]}"
+
+
+# =========================================================
+# ASSIGNMENT CACHE
+# =========================================================
+
+class TopicStore:
+    """
+    Per-corpus topic models and per-paper cluster assignments in SQLite,
+    so a repeated or grown corpus only vectorizes papers it has not seen.
+
+    Args:
+        path (str): SQLite file holding models and assignments.
+    """
+
+    def __init__(self, path=TRENDS_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS models ("
+            "corpus TEXT PRIMARY KEY, model BLOB NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS assignments ("
+            "corpus TEXT NOT NULL, paper TEXT NOT NULL, topic INTEGER NOT NULL, "
+            "PRIMARY KEY (corpus, paper)) WITHOUT ROWID;"
+        )
+        self._conn.commit()
+
+    def load_model(self, corpus):
+        with self._lock:
+            row = self._conn.execute("SELECT model FROM models WHERE corpus = ?", (corpus,)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def save_model(self, corpus, model):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO models (corpus, model, updated_at) VALUES (?, ?, ?)",
+                (corpus, pickle.dumps(model), time.time())
+            )
+
+    def assignments(self, corpus, keys):
+        """
+        Returns:
+            dict: Cached topic per paper key that has one.
+        """
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT paper, topic FROM assignments WHERE corpus = ? "
+                    f"AND paper IN ({','.join('?' * len(chunk))})",
+                    [corpus, *chunk]
+                )
+                found.update(rows)
+
+        return found
+
+    def save_assignments(self, corpus, keys, topics):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO assignments (corpus, paper, topic) VALUES (?, ?, ?)",
+                [(corpus, key, int(topic)) for key, topic in zip(keys, topics)]
+            )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = TopicStore()
+        return _store
+
+
+# =========================================================
+# TREND ANALYZER
+# =========================================================
+
+class TrendAnalyzer:
+    """
+    Sub-topic clusters of one query's corpus and how their share of each
+    year's papers changes.
+
+    Titles and abstracts are hashed into TF vectors one batch at a time
+    and clustered with MiniBatchKMeans, whose centroids are updated with
+    partial_fit as batches arrive; nothing is ever refit from scratch.
+    A paper's cluster is cached, so papers seen in an earlier run skip
+    vectorization entirely. Only topic ids, years and label word counts
+    are kept in memory.
+
+    Args:
+        query (str): The corpus' query; models and assignments are
+                     cached per normalized query.
+        n_topics (int): Number of clusters.
+        store (TopicStore): Cache; the process-wide one by default.
+    """
+
+    def __init__(self, query, n_topics=N_TOPICS, store=None):
+        self.corpus = make_key(normalize_query(query), n_topics)
+        self.n_topics = n_topics
+        self.store = store or get_store()
+
+        self._model = self.store.load_model(self.corpus)
+        self._dirty = False
+        self._pending = []
+
+        self._years = []
+        self._topics = []
+        self._words = [Counter() for _ in range(n_topics)]
+        self._all_words = Counter()
+        self._counters = {"papers": 0, "cached": 0, "vectorized": 0}
+
+    def _vectorize(self, texts):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        vectorizer = HashingVectorizer(
+            n_features=N_FEATURES, stop_words="english", alternate_sign=False, ngram_range=(1, 2)
+        )
+        return vectorizer.transform(texts)
+
+    def _assign(self, batch):
+        """
+        Fits on and predicts a batch of (key, year, words, text) papers
+        that have no cached topic.
+        """
+        from sklearn.cluster import MiniBatchKMeans
+
+        with tracing.span("trends.cluster", papers=len(batch)):
+            matrix = self._vectorize([text for _, _, _, text in batch])
+            self._counters["vectorized"] += len(batch)
+
+            if self._model is None:
+                self._model = MiniBatchKMeans(n_clusters=self.n_topics, random_state=0, n_init=3)
+            self._model.partial_fit(matrix)
+            self._dirty = True
+
+            topics = self._model.predict(matrix)
+
+        self.store.save_assignments(self.corpus, [key for key, _, _, _ in batch], topics)
+        self._record([year for _, year, _, _ in batch], topics, [words for _, _, words, _ in batch])
+
+    def _record(self, years, topics, words):
+        self._years.extend(years)
+        self._topics.extend(int(t) for t in topics)
+
+        for topic, paper_words in zip(topics, words):
+            self._words[topic].update(paper_words)
+            self._all_words.update(paper_words)
+
+    def add(self, papers):
+        """
+        Assigns a batch of papers to topics, from the cache where possible.
+        """
+        papers = list(papers)
+        keys = [paper_key(p) for p in papers]
+        cached = self.store.assignments(self.corpus, keys)
+
+        hits = [(p, cached[k]) for p, k in zip(papers, keys) if k in cached]
+        misses = [
+            (k, p["year"], label_words(p.get("title") or ""), paper_text(p))
+            for p, k in zip(papers, keys) if k not in cached
+        ]
+
+        self._counters["papers"] += len(papers)
+        self._counters["cached"] += len(hits)
+        tracing.add("topic_cache_hits", len(hits))
+
+        self._record(
+            [p["year"] for p, _ in hits],
+            [topic for _, topic in hits],
+            [label_words(p.get("title") or "") for p, _ in hits]
+        )
+
+        if self._model is None:
+            # Too few papers to place the first centroids yet
+            self._pending.extend(misses)
+            if len(self._pending) < MIN_FIT_PAPERS:
+                return
+            misses, self._pending = self._pending, []
+
+        if misses:
+            self._assign(misses)
+
+    def _flush(self):
+        if self._pending and len(self._pending) >= self.n_topics:
+            pending, self._pending = self._pending, []
+            self._assign(pending)
+
+        if self._dirty:
+            self.store.save_model(self.corpus, self._model)
+            self._dirty = False
+
+    def _label(self, topic, n=LABEL_TERMS):
+        """
+        Words most characteristic of a topic: frequent in it and rarer
+        elsewhere.
+        """
+        words = self._words[topic]
+        total = sum(words.values()) or 1
+        corpus_total = sum(self._all_words.values()) or 1
+
+        scored = [
+            (count * np.log1p((count / total) / (self._all_words[w] / corpus_total)), w)
+            for w, count in words.most_common(200)
+        ]
+        return [w for _, w in sorted(scored, reverse=True)[:n]]
+
+    def trends(self, recent_years=RECENT_YEARS, slope_years=SLOPE_YEARS):
+        """
+        Per-year topic shares and emerging scores, computed as whole-array
+        operations over a (years x topics) count matrix.
+
+        Returns:
+            dict: 'years' (ascending) and 'topics', most emerging first,
+                  each with 'id', 'label', 'terms', 'papers', 'shares'
+                  ({year: share}), 'emerging' (recent minus earlier mean
+                  share) and 'slope' (share change per year, recently).
+                  Empty when there are too few papers to cluster.
+        """
+        self._flush()
+
+        if not self._topics:
+            return {"years": [], "topics": []}
+
+        years = np.asarray(self._years, dtype=np.int64)
+        topics = np.asarray(self._topics, dtype=np.int64)
+
+        first = years.min()
+        span = years.max() - first + 1
+        axis = np.arange(first, first + span)
+
+        counts = np.bincount(
+            (years - first) * self.n_topics + topics, minlength=span * self.n_topics
+        ).reshape(span, self.n_topics).astype(np.float64)
+
+        totals = counts.sum(axis=1, keepdims=True)
+        shares = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+
+        recent = shares[-recent_years:].mean(axis=0)
+        earlier = shares[:-recent_years].mean(axis=0) if span > recent_years else np.zeros(self.n_topics)
+        emerging = recent - earlier
+
+        window = shares[-slope_years:]
+        x = np.arange(len(window), dtype=np.float64)
+        x -= x.mean()
+        denominator = (x ** 2).sum()
+        slope = x @ (window - window.mean(axis=0)) / denominator if denominator else np.zeros(self.n_topics)
+
+        papers = counts.sum(axis=0)
+
+        result = []
+        for topic in np.argsort(-emerging, kind="stable"):
+            if not papers[topic]:
+                continue
+
+            terms = self._label(topic)
+            result.append({
+                "id": int(topic),
+                "label": ", ".join(terms) or f"Topic {topic + 1}",
+                "terms": terms,
+                "papers": int(papers[topic]),
+                "shares": {int(y): round(float(s), 4) for y, s in zip(axis, shares[:, topic])},
+                "emerging": round(float(emerging[topic]), 4),
+                "slope": round(float(slope[topic]), 4)
+            })
+
+        return {"years": [int(y) for y in axis], "topics": result}
+
+    def stats(self):
+        stats = dict(self._counters)
+        stats["pending"] = len(self._pending)
+        return stats
+
+
+def analyze_trends(query, papers, n_topics=N_TOPICS):
+    analyzer = TrendAnalyzer(query, n_topics)
+    analyzer.add(papers)
+    return analyzer.trends()
@@ -0,0 +1,333 @@
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from cache import CACHE_DIR, paper_key
+from semantic_classifier import embed_papers, embed_texts
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+
+INDEX_DIR = os.path.join(CACHE_DIR, "vector_index")
+
+# Below this size search is exact; above it an IVF coarse quantizer is used
+IVF_MIN_VECTORS = 2048
+IVF_NPROBE = 8
+
+INITIAL_CAPACITY = 1024
+
+
+# =========================================================
+# VECTOR INDEX
+# =========================================================
+
+class VectorIndex:
+    """
+    Persistent approximate nearest-neighbour index over paper embeddings.
+
+    Vectors live in a memory-mapped float32 matrix that grows in place;
+    paper metadata and inverted-list assignments live in SQLite. Once
+    the index holds IVF_MIN_VECTORS papers, k-means centroids partition
+    it into inverted lists and searches probe only the nearest lists.
+    The quantizer is retrained whenever the index has grown 4x.
+
+    Args:
+        directory (str): Where the matrix, centroids and metadata live.
+    """
+
+    def __init__(self, directory=INDEX_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._centroids_path = os.path.join(directory, "centroids.npy")
+
+        self._conn = sqlite3.connect(os.path.join(directory, "papers.sqlite"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            "row INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, "
+            "paper TEXT NOT NULL, list_id INTEGER NOT NULL DEFAULT -1)"
+        )
+        self._conn.commit()
+
+        self.count = self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+        self.dim = None
+        self.capacity = 0
+        self.trained_size = 0
+        self._matrix = None
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            self.dim = meta["dim"]
+            self.capacity = meta["capacity"]
+            self.trained_size = meta.get("trained_size", 0)
+            self._matrix = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r+",
+                shape=(self.capacity, self.dim)
+            )
+
+        self.centroids = None
+        self.lists = {}
+
+        if os.path.exists(self._centroids_path):
+            self.centroids = np.load(self._centroids_path)
+            for row, list_id in self._conn.execute("SELECT row, list_id FROM papers"):
+                self.lists.setdefault(list_id, []).append(row)
+
+    def __len__(self):
+        return self.count
+
+    # -------------------- Storage -------------------- #
+
+    def _save_meta(self):
+        with open(self._meta_path, "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "capacity": self.capacity,
+                "trained_size": self.trained_size
+            }, f)
+
+    def _ensure_capacity(self, needed):
+        if self._matrix is not None and needed <= self.capacity:
+            return
+
+        capacity = max(INITIAL_CAPACITY, self.capacity)
+        while capacity < needed:
+            capacity *= 2
+
+        if self._matrix is not None:
+            self._matrix.flush()
+            del self._matrix
+
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+
+        self.capacity = capacity
+        self._matrix = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+",
+            shape=(self.capacity, self.dim)
+        )
+        self._save_meta()
+
+    def vectors(self):
+        if self._matrix is None:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return self._matrix[:self.count]
+
+    # -------------------- Inserts -------------------- #
+
+    def add(self, papers, vectors=None):
+        """
+        Inserts papers not already indexed.
+
+        Returns:
+            int: Number of papers added.
+        """
+        with self._lock:
+            keys = [paper_key(p) for p in papers]
+            known = self._known_keys(keys)
+
+            new = []
+            seen = set(known)
+            for i, key in enumerate(keys):
+                if key not in seen:
+                    seen.add(key)
+                    new.append(i)
+
+            if not new:
+                return 0
+
+            if vectors is None:
+                vectors = embed_papers([papers[i] for i in new])
+            else:
+                vectors = np.asarray(vectors, dtype=np.float32)[new]
+
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+
+            start = self.count
+            self._ensure_capacity(start + len(new))
+            self._matrix[start:start + len(new)] = vectors
+            self._matrix.flush()
+
+            list_ids = self._assign(vectors)
+
+            self._conn.executemany(
+                "INSERT INTO papers (row, key, paper, list_id) VALUES (?, ?, ?, ?)",
+                [
+                    (start + j, keys[i], json.dumps(papers[i]), int(list_ids[j]))
+                    for j, i in enumerate(new)
+                ]
+            )
+            self._conn.commit()
+
+            for j, list_id in enumerate(list_ids):
+                self.lists.setdefault(int(list_id), []).append(start + j)
+
+            self.count += len(new)
+
+            if self.count >= IVF_MIN_VECTORS and self.count >= 4 * max(self.trained_size, 1):
+                self.train()
+
+            return len(new)
+
+    def _known_keys(self, keys):
+        known = set()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT key FROM papers WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            known.update(r[0] for r in rows)
+        return known
+
+    def _assign(self, vectors):
+        if self.centroids is None:
+            return np.full(len(vectors), -1)
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def train(self):
+        """
+        Fits the IVF coarse quantizer and reassigns every vector.
+        """
+        from sklearn.cluster import MiniBatchKMeans
+
+        with self._lock:
+            vectors = np.asarray(self.vectors())
+            nlist = max(1, int(np.sqrt(len(vectors))))
+
+            kmeans = MiniBatchKMeans(n_clusters=nlist, batch_size=4096, n_init=3, random_state=0)
+            kmeans.fit(vectors)
+
+            centroids = kmeans.cluster_centers_.astype(np.float32)
+            centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+
+            self.centroids = centroids
+            np.save(self._centroids_path, centroids)
+
+            list_ids = self._assign(vectors)
+            self._conn.executemany(
+                "UPDATE papers SET list_id = ? WHERE row = ?",
+                [(int(list_id), row) for row, list_id in enumerate(list_ids)]
+            )
+            self._conn.commit()
+
+            self.lists = {}
+            for row, list_id in enumerate(list_ids):
+                self.lists.setdefault(int(list_id), []).append(row)
+
+            self.trained_size = len(vectors)
+            self._save_meta()
+
+    # -------------------- Search -------------------- #
+
+    def search(self, vector, k=10, nprobe=IVF_NPROBE, exclude=None):
+        """
+        Finds the k indexed papers closest to an embedding.
+
+        Returns:
+            list of tuple: (paper dict, cosine similarity), best first.
+        """
+        with self._lock:
+            if not self.count:
+                return []
+
+            vector = np.asarray(vector, dtype=np.float32)
+
+            if self.centroids is None:
+                candidates = np.arange(self.count)
+            else:
+                probe = np.argsort(-(self.centroids @ vector))[:nprobe]
+                candidates = np.array(
+                    [row for list_id in probe for row in self.lists.get(int(list_id), [])]
+                    + self.lists.get(-1, []),
+                    dtype=np.int64
+                )
+
+            if exclude is not None:
+                candidates = candidates[candidates != exclude]
+
+            if not len(candidates):
+                return []
+
+            scores = self._matrix[candidates] @ vector
+            k = min(k, len(candidates))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            rows = [int(candidates[i]) for i in top]
+            papers = self._papers_by_row(rows)
+
+            return [(papers[row], float(scores[i])) for row, i in zip(rows, top)]
+
+    def _papers_by_row(self, rows):
+        found = {}
+        for start in range(0, len(rows), 500):
+            chunk = rows[start:start + 500]
+            for row, paper in self._conn.execute(
+                f"SELECT row, paper FROM papers WHERE row IN ({','.join('?' * len(chunk))})",
+                chunk
+            ):
+                found[row] = json.loads(paper)
+        return found
+
+    def similar_to(self, paper, k=5):
+        """
+        Papers like this one, served entirely from the local index.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT row FROM papers WHERE key = ?", (paper_key(paper),)
+            ).fetchone()
+
+            if row is not None:
+                return self.search(self._matrix[row[0]], k=k, exclude=row[0])
+
+        return self.search(embed_papers([paper])[0], k=k)
+
+
+# =========================================================
+# RE-RANKING
+# =========================================================
+
+def rerank(query, papers, k=None, vectors=None):
+    """
+    Orders papers by semantic similarity to the query.
+
+    Returns:
+        list of dict: The top k papers (all if k is None), best first.
+    """
+    if not papers:
+        return []
+
+    if vectors is None:
+        vectors = embed_papers(papers)
+
+    scores = vectors @ embed_texts([query])[0]
+    order = np.argsort(-scores)[:k]
+
+    return [papers[i] for i in order]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VectorIndex()
+
+    return _index